@@ -0,0 +1,305 @@
+import argparse
+import json
+import subprocess
+import sys
+
+# Setiap skenario dijalankan di proses Python baru supaya waktu import
+# dan RSS tidak tercampur dengan modul yang sudah dimuat sebelumnya.
+STARTUP_TEMPLATE = """
+import json, sys, time
+t0 = time.perf_counter()
+{imports}
+t1 = time.perf_counter()
+{load}
+t2 = time.perf_counter()
+{query}
+t3 = time.perf_counter()
+try:
+    import resource
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+except ImportError:
+    rss_mb = None
+print(json.dumps({{
+    'import_ms': (t1 - t0) * 1000,
+    'load_ms': (t2 - t1) * 1000,
+    'first_query_ms': (t3 - t2) * 1000,
+    'rss_mb': rss_mb,
+    'modules': len(sys.modules),
+    'heavy': sorted(m for m in ('gensim', 'pandas', 'docx', 'pypdf', 'scipy') if m in sys.modules),
+}}))
+"""
+
+STARTUP_SCENARIOS = {
+    'pipeline': {
+        'imports': "from pipeline import Pipeline",
+        'load': "ir = Pipeline(); ir.load_model({model!r})",
+        'query': "ir.engine.index[ir.engine.lsi_model[ir.engine.tfidf_model[ir.engine.dictionary.doc2bow(ir.preprocess({q!r}))]]]",
+    },
+    'runtime': {
+        'imports': "from search_runtime import SearchRuntime",
+        'load': "rt = SearchRuntime(); rt.load_index({index!r})",
+        'query': "rt.search({q!r})",
+    },
+}
+
+
+def bench_startup(args):
+    print(f"{'skenario':<10} {'import':>10} {'load':>10} {'query#1':>10} {'RSS':>9} {'modul':>6}  dependensi berat")
+    for name, parts in STARTUP_SCENARIOS.items():
+        fmt = {'model': args.model, 'index': args.index, 'q': args.query}
+        code = STARTUP_TEMPLATE.format(**{k: v.format(**fmt) for k, v in parts.items()})
+        proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{name:<10} GAGAL: {proc.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        rss = f"{r['rss_mb']:.1f}MB" if r['rss_mb'] is not None else '-'
+        print(f"{name:<10} {r['import_ms']:>8.1f}ms {r['load_ms']:>8.1f}ms {r['first_query_ms']:>8.1f}ms "
+              f"{rss:>9} {r['modules']:>6}  {', '.join(r['heavy']) or '-'}")
+
+
+# max |jalur gensim (tfidf_model -> lsi_model) - tabel fold-in| untuk daftar query stems
+def projection_difference(engine, queries):
+    import numpy as np
+
+    def gensim_path(stems):
+        query_lsi = engine.lsi_model[engine.tfidf_model[engine.dictionary.doc2bow(stems)]]
+        vec = np.zeros(engine.lsi_model.num_topics)
+        for topic_id, value in query_lsi:
+            vec[topic_id] = value
+        return vec
+
+    def fold_in_path(stems):
+        vec = engine.project(stems)
+        return np.zeros(engine.lsi_model.num_topics) if vec is None else vec
+
+    return max(np.abs(gensim_path(q) - fold_in_path(q)).max() for q in queries), gensim_path, fold_in_path
+
+
+# Cek kesetaraan numerik fold-in vs gensim pada korpus sintetis kecil di memori,
+# jadi bisa dijalankan tanpa ir_model.pkl (repo belum punya test suite; ini
+# penggantinya). Termasuk setelah add_documents menambah kata baru ke dictionary.
+def check_projection(args):
+    import random
+    from lsi import LSIRetrieval
+
+    rng = random.Random(args.seed)
+    words = [f'kata{i}' for i in range(args.vocab)]
+    docs = [[rng.choice(words) for _ in range(rng.randint(5, 30))] for _ in range(args.docs)]
+    engine = LSIRetrieval(docs, args.topics)
+
+    def random_queries(vocab):
+        return [[rng.choice(vocab) for _ in range(rng.randint(1, 6))] for _ in range(args.n)]
+
+    max_diff, _, _ = projection_difference(engine, random_queries(words))
+    print(f"korpus awal          max |gensim - fold-in| = {max_diff:.2e}")
+    assert max_diff < 1e-9, "Proyeksi fold-in tidak sama dengan jalur gensim!"
+
+    new_words = [f'baru{i}' for i in range(10)]
+    engine.add_documents([[rng.choice(words + new_words) for _ in range(20)] for _ in range(5)])
+    max_diff, _, _ = projection_difference(engine, random_queries(words + new_words))
+    print(f"setelah add_documents max |gensim - fold-in| = {max_diff:.2e}")
+    assert max_diff < 1e-9, "Proyeksi fold-in tidak sama dengan jalur gensim setelah add_documents!"
+    print("OK")
+
+
+# Proyeksi query: jalur gensim (tfidf_model -> lsi_model) vs tabel fold-in
+# pada model nyata. Kesetaraan numerik juga dicek (lihat check_projection).
+def bench_projection(args):
+    import random
+    import time
+    from pipeline import Pipeline
+
+    ir = Pipeline()
+    if not ir.load_model(args.model): return
+    engine = ir.engine
+    vocab = [engine.dictionary[i] for i in range(engine.lsi_model.num_terms)]
+    rng = random.Random(42)
+    queries = [[rng.choice(vocab) for _ in range(rng.randint(1, 6))] for _ in range(args.n)]
+
+    engine.fold_in_table()
+    max_diff, gensim_path, fold_in_path = projection_difference(engine, queries)
+    print(f"max |gensim - fold-in| = {max_diff:.2e}")
+    assert max_diff < 1e-9, "Proyeksi fold-in tidak sama dengan jalur gensim!"
+
+    for name, fn in (('gensim', gensim_path), ('fold-in', fold_in_path)):
+        t0 = time.perf_counter()
+        for q in queries:
+            fn(q)
+        per_query = (time.perf_counter() - t0) / len(queries) * 1e6
+        print(f"{name:<8} {per_query:>8.1f} us/query")
+
+
+# Overhead koreksi ejaan: lookup per kata, dan search dengan/tanpa koreksi
+def bench_spelling(args):
+    import random
+    import time
+    from pipeline import Pipeline
+
+    ir = Pipeline()
+    if not ir.load_model(args.model): return
+    if ir.spell is None:
+        print("Model belum memiliki index ejaan, jalankan ulang Pipeline.run().")
+        return
+
+    rng = random.Random(42)
+    words = [w for w in ir.spell.word_list if len(w) > 4]
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+
+    def typo(word):
+        i = rng.randrange(len(word))
+        kind = rng.choice(('hapus', 'ganti', 'sisip'))
+        if kind == 'hapus':
+            return word[:i] + word[i + 1:]
+        if kind == 'ganti':
+            return word[:i] + rng.choice(letters) + word[i + 1:]
+        return word[:i] + rng.choice(letters) + word[i:]
+
+    samples = [(w, typo(w)) for w in (rng.choice(words) for _ in range(args.n))]
+    t0 = time.perf_counter()
+    fixed = [ir.spell.correct(bad)[0] for _, bad in samples]
+    per_lookup = (time.perf_counter() - t0) / len(samples) * 1e6
+    accuracy = sum(f == w for (w, _), f in zip(samples, fixed)) / len(samples)
+    print(f"lookup     {per_lookup:>8.1f} us/kata | koreksi kembali ke kata asli: {accuracy:.1%}")
+
+    queries = [' '.join(bad for _, bad in samples[i:i + 3]) for i in range(0, len(samples), 3)]
+    for correct in (False, True):
+        t0 = time.perf_counter()
+        for q in queries:
+            ir.search(q, correct=correct)
+        per_query = (time.perf_counter() - t0) / len(queries) * 1e6
+        print(f"search{' +koreksi' if correct else '':<9} {per_query:>8.1f} us/query")
+
+
+# Stress test SearchIndex: ribuan query dari banyak thread sementara thread
+# penulis terus membangun ulang index (tombstone + fold-in ulang dokumen) dan
+# mempublikasikan snapshot baru. Setiap hasil dicek terhadap hasil serial pada
+# snapshot yang sama; throughput dibandingkan antar jumlah thread.
+def bench_concurrency(args):
+    import random
+    import threading
+    import time
+    import numpy as np
+    from pipeline import Pipeline
+
+    ir = Pipeline()
+    if not ir.load_model(args.model): return
+    rng = random.Random(42)
+    vocab = [ir.engine.dictionary[i] for i in range(ir.engine.lsi_model.num_terms)]
+    queries = [' '.join(rng.choice(vocab) for _ in range(rng.randint(1, 4))) for _ in range(200)]
+    if len(ir.file_paths) < len(ir.file_names):
+        ir.file_paths = ir.file_paths + [f'doc-{i}' for i in range(len(ir.file_paths), len(ir.file_names))]
+
+    # dokumen yang dihapus lalu dimasukkan ulang oleh penulis; disiapkan di awal
+    # karena remove_documents mengosongkan raw_contents dokumen yang dihapus
+    live = [i for i in range(len(ir.file_names)) if not ir.deleted[i]]
+    originals = []
+    for doc_id in rng.sample(live, min(500, len(live))):
+        stems, positions = ir.preprocess_positions(ir.raw_contents[doc_id])
+        originals.append({'path': ir.file_paths[doc_id], 'name': ir.file_names[doc_id], 'mtime': 0.0,
+                          'content': ir.raw_contents[doc_id], 'record': ir.metadata.record(doc_id),
+                          'stems': stems, 'positions': positions})
+
+    snapshots = [ir.snapshot()]
+    current = [(0, snapshots[0])]
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set() and len(snapshots) < args.rebuilds:
+            batch = rng.sample(originals, min(5, len(originals)))
+            ir.remove_documents([doc['path'] for doc in batch])
+            ir.apply_documents(batch)
+            snapshots.append(ir.snapshot())
+            current[0] = (len(snapshots) - 1, snapshots[-1])
+            time.sleep(args.rebuild_interval)
+
+    print(f"{'thread':>6} {'query':>7} {'qps':>9} {'speedup':>8} {'p50':>9} {'p95':>9} {'snapshot':>9}")
+    base_qps = None
+    observed = []
+    for num_threads in args.threads:
+        latencies = [[] for _ in range(num_threads)]
+        per_thread = args.n // num_threads
+
+        def reader(slot):
+            local_rng = random.Random(slot)
+            for _ in range(per_thread):
+                generation, index = current[0]
+                query = local_rng.choice(queries)
+                t0 = time.perf_counter()
+                results = index.search(query)
+                latencies[slot].append(time.perf_counter() - t0)
+                observed.append((generation, query, [doc_id for doc_id, _ in results]))
+
+        stop.clear()
+        writer_thread = threading.Thread(target=writer)
+        threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(num_threads)]
+        first_generation = current[0][0]
+        t0 = time.perf_counter()
+        writer_thread.start()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        writer_thread.join()
+
+        lat = np.array([x for slot in latencies for x in slot]) * 1000
+        qps = len(lat) / elapsed
+        base_qps = base_qps or qps
+        print(f"{num_threads:>6} {len(lat):>7} {qps:>9.0f} {qps / base_qps:>7.2f}x {np.percentile(lat, 50):>7.2f}ms "
+              f"{np.percentile(lat, 95):>7.2f}ms {first_generation:>4}-{current[0][0]:<4}")
+
+    # konsistensi: hasil konkuren == hasil serial pada snapshot yang sama,
+    # dan tidak ada dokumen yang sudah dihapus pada snapshot tersebut
+    expected = {}
+    mismatches = 0
+    for generation, query, doc_ids in observed:
+        key = (generation, query)
+        if key not in expected:
+            expected[key] = [doc_id for doc_id, _ in snapshots[generation].search(query)]
+        deleted = snapshots[generation].deleted
+        if doc_ids != expected[key] or (deleted is not None and deleted[doc_ids].any()):
+            mismatches += 1
+    print(f"{len(observed)} hasil dicek pada {len(snapshots)} snapshot: {mismatches} tidak konsisten")
+    assert mismatches == 0, "Hasil pencarian konkuren tidak konsisten!"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark sistem IR")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('startup', help="waktu import dan RSS sampai query pertama")
+    p.add_argument('--model', default='ir_model.pkl')
+    p.add_argument('--index', default='ir_index.npz')
+    p.add_argument('--query', default='bank indonesia')
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser('projection', help="proyeksi query gensim vs tabel fold-in")
+    p.add_argument('--model', default='ir_model.pkl')
+    p.add_argument('-n', type=int, default=2000, help="jumlah query acak")
+    p.set_defaults(func=bench_projection)
+
+    p = sub.add_parser('check-projection', help="cek fold-in == gensim pada korpus kecil di memori (tanpa model)")
+    p.add_argument('--docs', type=int, default=60)
+    p.add_argument('--vocab', type=int, default=40)
+    p.add_argument('--topics', type=int, default=5)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-n', type=int, default=500, help="jumlah query acak")
+    p.set_defaults(func=check_projection)
+
+    p = sub.add_parser('spelling', help="overhead koreksi ejaan")
+    p.add_argument('--model', default='ir_model.pkl')
+    p.add_argument('-n', type=int, default=3000, help="jumlah kata salah ketik")
+    p.set_defaults(func=bench_spelling)
+
+    p = sub.add_parser('concurrency', help="stress test SearchIndex multi-thread dengan index yang dibangun ulang")
+    p.add_argument('--model', default='ir_model.pkl')
+    p.add_argument('-n', type=int, default=4000, help="jumlah query per putaran")
+    p.add_argument('--threads', type=lambda s: [int(x) for x in s.split(',')], default=[1, 2, 4, 8])
+    p.add_argument('--rebuilds', type=int, default=50, help="maksimum jumlah snapshot")
+    p.add_argument('--rebuild-interval', type=float, default=0.02, help="jeda antar rebuild (detik)")
+    p.set_defaults(func=bench_concurrency)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,164 @@
+import argparse
+import numpy as np
+
+
+# Spherical k-means++ pada sampel: pusat awal saling berjauhan (jarak = 1 - cosine)
+def _init_centroids(sample, k, rng):
+    centroids = np.zeros((k, sample.shape[1]), dtype=sample.dtype)
+    centroids[0] = sample[rng.integers(len(sample))]
+    best = sample @ centroids[0]
+    for i in range(1, k):
+        distance = np.maximum(1 - best, 0)
+        total = distance.sum()
+        idx = rng.choice(len(sample), p=distance / total) if total > 0 else rng.integers(len(sample))
+        centroids[i] = sample[idx]
+        best = np.maximum(best, sample @ centroids[i])
+    return centroids
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# Klaster dokumen dari vektor LSI ternormalisasi (mini-batch spherical k-means):
+# tiap iterasi hanya satu batch acak yang dibaca, dan penetapan klaster akhir
+# dihitung per chunk, sehingga doc_vectors boleh berupa memmap berukuran besar.
+# Centroid juga dipakai sebagai routing kasar: skoring query dibatasi ke
+# dokumen di klaster terdekat (route_mask).
+class DocumentClusters:
+    def __init__(self, centroids, assignments, top_terms):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.top_terms = top_terms
+
+    def __len__(self):
+        return len(self.centroids)
+
+    # doc_vectors: baris ternormalisasi; u + vocab: untuk kata representatif per klaster
+    # mask: dokumen yang ikut melatih centroid (mis. bukan tombstone)
+    @classmethod
+    def fit(cls, doc_vectors, u, vocab, num_clusters=20, batch_size=1024, max_iter=200, tol=1e-4,
+            chunk_size=65536, top_n=10, mask=None, seed=0, progress=None):
+        rng = np.random.default_rng(seed)
+        candidates = np.arange(len(doc_vectors)) if mask is None else np.flatnonzero(mask)
+        num_clusters = min(num_clusters, len(candidates))
+
+        def sample(size):
+            picked = np.sort(rng.choice(len(candidates), min(size, len(candidates)), replace=False))
+            return np.asarray(doc_vectors[candidates[picked]], dtype=np.float64)
+
+        centroids = _init_centroids(sample(max(10 * num_clusters, batch_size)), num_clusters, rng)
+        counts = np.zeros(num_clusters)
+        if progress: progress.start('cluster', max_iter)
+        for _ in range(max_iter):
+            batch = sample(batch_size)
+            labels = np.argmax(batch @ centroids.T, axis=1)
+            batch_counts = np.bincount(labels, minlength=num_clusters)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, batch)
+
+            # rata-rata berjalan per centroid (learning rate = 1 / jumlah anggota)
+            counts += batch_counts
+            updated = batch_counts > 0
+            eta = (batch_counts[updated] / counts[updated])[:, None]
+            new_centroids = centroids.copy()
+            new_centroids[updated] = (1 - eta) * centroids[updated] + eta * sums[updated] / batch_counts[updated, None]
+            new_centroids = _normalize(new_centroids)
+            shift = np.abs(new_centroids - centroids).max()
+            centroids = new_centroids
+            if progress: progress.advance(docs=len(batch))
+            if shift < tol:
+                # konvergen: sisa iterasi tidak dijalankan, progres ditutup di 100%
+                if progress: progress.total = progress.done
+                break
+        if progress: progress.finish()
+
+        clusters = cls(centroids.astype(np.float32), np.zeros(0, dtype=np.int32), [])
+        for start in range(0, len(doc_vectors), chunk_size):
+            clusters.add(doc_vectors[start:start + chunk_size])
+        clusters.top_terms = clusters.representative_terms(u, vocab, top_n)
+        return clusters
+
+    # klaster terdekat untuk vektor baru (dipanggil juga saat dokumen ditambahkan)
+    def assign(self, vectors):
+        return np.argmax(np.asarray(vectors, dtype=np.float32) @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(self, vectors):
+        self.assignments = np.concatenate([self.assignments, self.assign(vectors)])
+
+    # kata dengan bobot terbesar pada arah centroid: U @ centroid
+    def representative_terms(self, u, vocab, top_n=10):
+        result = []
+        for centroid in self.centroids:
+            scores = u @ centroid
+            n = min(top_n, len(scores))
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top])]
+            result.append([vocab[term_id] for term_id in top])
+        return result
+
+    def sizes(self, mask=None):
+        assignments = self.assignments if mask is None else self.assignments[mask]
+        return np.bincount(assignments, minlength=len(self))
+
+    # [(cluster_id, jumlah dokumen, kata representatif)]
+    def summary(self, mask=None):
+        return [(i, int(size), self.top_terms[i]) for i, size in enumerate(self.sizes(mask))]
+
+    # doc id anggota klaster, paling dekat ke centroid lebih dulu
+    # doc_rows: fungsi doc ids -> baris vektor dokumen
+    def members(self, cluster_id, doc_rows, mask=None, limit=None):
+        in_cluster = self.assignments == cluster_id
+        if mask is not None:
+            in_cluster &= mask
+        doc_ids = np.flatnonzero(in_cluster)
+        scores = np.asarray(doc_rows(doc_ids)) @ self.centroids[cluster_id]
+        order = np.argsort(-scores)[:limit]
+        return [(int(doc_ids[i]), float(scores[i])) for i in order]
+
+    # routing kasar: hanya dokumen di `probes` klaster terdekat dari query
+    def route_mask(self, query_vec, probes=3):
+        sims = self.centroids @ np.asarray(query_vec, dtype=np.float32)
+        probes = min(probes, len(sims))
+        nearest = np.argpartition(-sims, probes - 1)[:probes]
+        return np.isin(self.assignments, nearest)
+
+    def to_arrays(self, prefix='cluster_'):
+        return {
+            prefix + 'centroids': self.centroids,
+            prefix + 'assignments': self.assignments,
+            prefix + 'top_terms': np.array(self.top_terms, dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, data, prefix='cluster_'):
+        return cls(data[prefix + 'centroids'], data[prefix + 'assignments'],
+                   data[prefix + 'top_terms'].tolist())
+
+
+if __name__ == '__main__':
+    from pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Klaster dokumen (mini-batch k-means atas vektor LSI)")
+    parser.add_argument('--model', default='ir_model.pkl')
+    parser.add_argument('--index', default='ir_index.npz')
+    parser.add_argument('--clusters', type=int, default=20, help="jumlah klaster (0: pakai klaster yang ada)")
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--show', type=int, default=None, help="tampilkan anggota klaster ini")
+    args = parser.parse_args()
+
+    ir = Pipeline()
+    if ir.load_model(args.model):
+        if args.clusters:
+            ir.cluster(args.clusters, batch_size=args.batch_size)
+            ir.save_model(args.model)
+            ir.export_index(args.index)
+        if ir.clusters is None:
+            print("Model belum memiliki klaster.")
+        elif args.show is None:
+            for cluster_id, size, terms in ir.clusters.summary(~ir.deleted):
+                print(f"[{cluster_id}] {size} dokumen | {', '.join(terms)}")
+        else:
+            for doc_id, score in ir.browse(args.show, limit=20):
+                print(f"{ir.file_names[doc_id]} | {score:.4f}")
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+# Statistik korpus yang dihitung sekali saat build model:
+# collection frequency (cf), document frequency (df), panjang dokumen
+# dan jumlah dokumen per format. Disimpan sebagai array NumPy.
+class CorpusStats:
+    def __init__(self, num_terms=0):
+        self.cf = np.zeros(num_terms, dtype=np.int64)
+        self.df = np.zeros(num_terms, dtype=np.int64)
+        self.doc_lengths = np.zeros(0, dtype=np.int64)
+        self.format_names = np.array([], dtype=str)
+        self.format_counts = np.zeros(0, dtype=np.int64)
+
+    # cf/df diambil langsung dari corpora.Dictionary (cfs/dfs)
+    @classmethod
+    def from_dictionary(cls, dictionary, corpus_bow, file_names):
+        stats = cls(len(dictionary))
+        for term_id, value in dictionary.cfs.items():
+            stats.cf[term_id] = value
+        for term_id, value in dictionary.dfs.items():
+            stats.df[term_id] = value
+        stats.doc_lengths = np.array([sum(c for _, c in bow) for bow in corpus_bow], dtype=np.int64)
+        stats._count_formats(file_names)
+        return stats
+
+    # update inkremental untuk dokumen baru (term id baru memperpanjang array)
+    def add_documents(self, corpus_bow, file_names, num_terms):
+        if num_terms > len(self.cf):
+            grow = num_terms - len(self.cf)
+            self.cf = np.concatenate([self.cf, np.zeros(grow, dtype=np.int64)])
+            self.df = np.concatenate([self.df, np.zeros(grow, dtype=np.int64)])
+
+        ids = [term_id for bow in corpus_bow for term_id, _ in bow]
+        counts = [count for bow in corpus_bow for _, count in bow]
+        if ids:
+            ids = np.array(ids, dtype=np.int64)
+            self.cf += np.bincount(ids, weights=counts, minlength=len(self.cf)).astype(np.int64)
+            self.df += np.bincount(ids, minlength=len(self.df))
+
+        lengths = np.array([sum(c for _, c in bow) for bow in corpus_bow], dtype=np.int64)
+        self.doc_lengths = np.concatenate([self.doc_lengths, lengths])
+        self._count_formats(file_names)
+
+    # kebalikan add_documents untuk dokumen yang dihapus (panjangnya dicatat 0)
+    def remove_documents(self, doc_ids, corpus_bow, file_names):
+        for bow in corpus_bow:
+            for term_id, count in bow:
+                self.cf[term_id] -= count
+                self.df[term_id] -= 1
+        self.doc_lengths[doc_ids] = 0
+        self._count_formats(file_names, -1)
+
+    def _count_formats(self, file_names, step=1):
+        counts = dict(zip(self.format_names.tolist(), self.format_counts.tolist()))
+        for name in file_names:
+            ext = name.rsplit('.', 1)[-1].lower()
+            counts[ext] = counts.get(ext, 0) + step
+        self.format_names = np.array(sorted(counts), dtype=str)
+        self.format_counts = np.array([counts[k] for k in sorted(counts)], dtype=np.int64)
+
+    # k term teratas berdasarkan cf atau df, tanpa sort seluruh vocabulary
+    def top_terms(self, k=500, by='cf'):
+        values = self.cf if by == 'cf' else self.df
+        k = min(k, len(values))
+        if k == 0:
+            return []
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind='stable')]
+        return [(int(term_id), int(values[term_id])) for term_id in top]
+
+    def to_arrays(self, prefix='stats_'):
+        return {
+            prefix + 'cf': self.cf,
+            prefix + 'df': self.df,
+            prefix + 'doc_lengths': self.doc_lengths,
+            prefix + 'format_names': self.format_names,
+            prefix + 'format_counts': self.format_counts,
+        }
+
+    @classmethod
+    def from_arrays(cls, data, prefix='stats_'):
+        stats = cls()
+        stats.cf = data[prefix + 'cf']
+        stats.df = data[prefix + 'df']
+        stats.doc_lengths = data[prefix + 'doc_lengths']
+        stats.format_names = data[prefix + 'format_names']
+        stats.format_counts = data[prefix + 'format_counts']
+        return stats
@@ -68,6 +68,15 @@ def load_all_data(folder_path):
     print(f"   Total data bersih (> {MIN_WORD_COUNT} kata): {len(full_df)}")
     return full_df
 
+def meta_row(row, fmt):
+    """Baris metadata.csv untuk file yang tersimpan"""
+    return {
+        'file': f"{sanitize_filename(row['judul'])}.{fmt}",
+        'format': fmt,
+        'kategori': row['kategori'],
+        'sumber': row.get('sumber', ''),
+    }
+
 # --- FUNGSI SAVE ---
 def save_txt(row, folder):
     fname = sanitize_filename(row['judul'])
@@ -134,6 +143,7 @@ def main():
     print(f"   Target: {TARGET_PER_CATEGORY} file per kategori (dibagi 3 format).")
 
     total_files = 0
+    meta_rows = []
 
     # 4. Loop Semua Kategori
     for cat in categories:
@@ -150,19 +160,21 @@ def main():
         parts = np.array_split(samples, 3)
         
         count_cat = 0
-        # Batch 1 -> TXT
-        for _, row in parts[0].iterrows():
-            if save_txt(row, dirs['txt']): count_cat += 1
-        # Batch 2 -> DOCX
-        for _, row in parts[1].iterrows():
-            if save_docx(row, dirs['docx']): count_cat += 1
-        # Batch 3 -> PDF
-        for _, row in parts[2].iterrows():
-            if save_pdf(row, dirs['pdf']): count_cat += 1
+        # Batch 1 -> TXT, Batch 2 -> DOCX, Batch 3 -> PDF
+        for part, fmt, save in ((parts[0], 'txt', save_txt),
+                                (parts[1], 'docx', save_docx),
+                                (parts[2], 'pdf', save_pdf)):
+            for _, row in part.iterrows():
+                if save(row, dirs[fmt]):
+                    count_cat += 1
+                    meta_rows.append(meta_row(row, fmt))
             
         print(f"      Disimpan: {count_cat} file.")
         total_files += count_cat
 
+    # Metadata (kategori, sumber, format) dibaca Pipeline untuk filter pencarian
+    pd.DataFrame(meta_rows).to_csv(os.path.join(OUTPUT_FOLDER, 'metadata.csv'), index=False)
+
     print("-" * 40)
     print(f"SELESAI! Total {total_files} file tersimpan di '{OUTPUT_FOLDER}'.")
 
@@ -0,0 +1,239 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from pipeline import Pipeline
+from progress import Progress
+
+
+# ==========================================
+# QUERY & RELEVANCE JUDGMENTS (qrels)
+# ==========================================
+
+# query file: satu query per baris "qid<TAB>teks query"
+def load_queries(path):
+    queries = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                qid, text = line.rstrip('\n').split('\t', 1)
+                queries[qid] = text
+    return queries
+
+
+# qrels format TREC: "qid iter nama_file relevansi"
+def load_qrels(path, file_names):
+    name_to_ids = {}
+    for doc_id, name in enumerate(file_names):
+        name_to_ids.setdefault(name, []).append(doc_id)
+
+    qrels = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 4 or int(parts[-1]) <= 0:
+                continue
+            qid, name = parts[0], ' '.join(parts[2:-1])
+            qrels.setdefault(qid, set()).update(name_to_ids.get(name, []))
+    return qrels
+
+
+# teks query dari sebuah dokumen: baris pertama (judul pada docx/pdf),
+# dilewati jika berupa baris "Kategori: ..."
+def query_from_document(content, num_words=12):
+    for line in content.splitlines():
+        line = line.strip()
+        if line and not line.startswith('Kategori:'):
+            return ' '.join(line.split()[:num_words])
+    return ''
+
+
+# Query & qrels otomatis dari label kategori (data/create.py):
+# dokumen sampel menjadi query, dokumen lain dengan kategori sama = relevan.
+# Dokumen sumber query dikeluarkan dari ranking (lihat Evaluator.exclude).
+def category_judgments(ir, per_category=10, num_words=12, seed=42):
+    codes = ir.metadata.codes['kategori']
+    rng = random.Random(seed)
+    queries, qrels, exclude = {}, {}, {}
+
+    for code, kategori in enumerate(ir.metadata.values['kategori']):
+        if not kategori:
+            continue
+        members = np.flatnonzero(codes == code).tolist()
+        for doc_id in rng.sample(members, min(per_category, len(members))):
+            text = query_from_document(ir.raw_contents[doc_id], num_words)
+            if not text:
+                continue
+            qid = f"{kategori}-{doc_id}"
+            queries[qid] = text
+            qrels[qid] = set(members) - {doc_id}
+            exclude[qid] = doc_id
+    return queries, qrels, exclude
+
+
+# ==========================================
+# METRIK
+# ==========================================
+
+def average_precision(ranking, relevant):
+    if not relevant:
+        return 0.0
+    hits, total = 0, 0.0
+    for rank, doc_id in enumerate(ranking, 1):
+        if doc_id in relevant:
+            hits += 1
+            total += hits / rank
+    return total / len(relevant)
+
+
+def ndcg_at_k(ranking, relevant, k=10):
+    dcg = sum(1.0 / np.log2(rank + 2) for rank, doc_id in enumerate(ranking[:k]) if doc_id in relevant)
+    idcg = sum(1.0 / np.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def recall_at_k(ranking, relevant, k):
+    if not relevant:
+        return 0.0
+    return len(set(ranking[:k]) & relevant) / len(relevant)
+
+
+# ==========================================
+# EVALUATOR
+# ==========================================
+
+# Menjalankan satu set query terhadap fungsi search(query, top_n) -> [(doc_id, score)]
+# dan menghitung MAP, nDCG@10, recall@k serta persentil latensi.
+# Seperti trec_eval, query tanpa judgment di qrels dilewati (dilaporkan
+# sebagai 'unjudged'), bukan dihitung AP = 0.
+class Evaluator:
+    def __init__(self, queries, qrels, exclude=None, depth=100, recall_ks=(10, 100)):
+        self.queries = queries
+        self.qrels = qrels
+        self.exclude = exclude or {}
+        self.depth = depth
+        self.recall_ks = recall_ks
+
+    def evaluate(self, search):
+        aps, ndcgs, latencies = [], [], []
+        recalls = {k: [] for k in self.recall_ks}
+        unjudged = 0
+
+        for qid, text in self.queries.items():
+            relevant = self.qrels.get(qid, set())
+            if not relevant:
+                unjudged += 1
+                continue
+            t0 = time.perf_counter()
+            results = search(text, self.depth + 1)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+            ranking = [doc_id for doc_id, _ in results if doc_id != self.exclude.get(qid)][:self.depth]
+            aps.append(average_precision(ranking, relevant))
+            ndcgs.append(ndcg_at_k(ranking, relevant, 10))
+            for k in self.recall_ks:
+                recalls[k].append(recall_at_k(ranking, relevant, k))
+
+        latencies = np.array(latencies)
+        report = {
+            'queries': len(self.queries) - unjudged,
+            'unjudged': unjudged,
+            'MAP': float(np.mean(aps)) if aps else 0.0,
+            'nDCG@10': float(np.mean(ndcgs)) if ndcgs else 0.0,
+        }
+        for k in self.recall_ks:
+            report[f'R@{k}'] = float(np.mean(recalls[k])) if recalls[k] else 0.0
+        for p in (50, 95, 99):
+            report[f'p{p}_ms'] = float(np.percentile(latencies, p)) if len(latencies) else 0.0
+        return report
+
+
+# ==========================================
+# SWEEP KONFIGURASI
+# ==========================================
+
+# backend: nama -> fungsi(pipeline, tmp_dir) yang mengembalikan search(query, top_n)
+def backend_lsi(ir, tmp_dir):
+    return lambda query, top_n: ir.search(query, top_n)
+
+
+def backend_runtime(ir, tmp_dir):
+    from search_runtime import SearchRuntime
+    index_path = os.path.join(tmp_dir, 'ir_index.npz')
+    ir.export_index(index_path)
+    runtime = SearchRuntime()
+    runtime.load_index(index_path)
+    return runtime.search
+
+
+# Sejak tabel fold-in, 'lsi' (Pipeline/gensim) dan 'runtime' (SearchRuntime,
+# NumPy saja) memberi ranking yang sama; perbandingan keduanya hanya mengukur latensi.
+BACKENDS = {
+    'lsi': backend_lsi,
+    'runtime': backend_runtime,
+}
+
+
+# Membaca & preprocessing sekali, lalu build + evaluasi untuk setiap num_topics x backend
+def sweep(folder_path, topics=(15,), backends=('lsi',), queries_path=None, qrels_path=None,
+          per_category=10, depth=100):
+    ir = Pipeline()
+    ir.read_directory(folder_path)
+    if not ir.raw_contents:
+        print("[!] Evaluasi dihentikan karena tidak ada dokumen.")
+        return []
+    processed_docs = ir.preprocess_all()
+
+    if queries_path and qrels_path:
+        queries = load_queries(queries_path)
+        qrels = load_qrels(qrels_path, ir.file_names)
+        exclude = {}
+    else:
+        queries, qrels, exclude = category_judgments(ir, per_category)
+    print(f"[*] Evaluasi dengan {len(queries)} query.")
+    evaluator = Evaluator(queries, qrels, exclude, depth)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num_topics in topics:
+            t0 = time.perf_counter()
+            ir.build(processed_docs, num_topics, Progress(interval=60))
+            build_s = time.perf_counter() - t0
+            for name in backends:
+                search = BACKENDS[name](ir, tmp_dir)
+                report = evaluator.evaluate(search)
+                rows.append({'topics': num_topics, 'backend': name, 'build_s': build_s, **report})
+    return rows
+
+
+def format_table(rows):
+    if not rows:
+        return "(tidak ada hasil)"
+    columns = list(rows[0].keys())
+    cells = [[f"{row[c]:.4f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ['  '.join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines.append('  '.join('-' * w for w in widths))
+    lines += ['  '.join(v.rjust(w) for v, w in zip(r, widths)) for r in cells]
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluasi kualitas retrieval vs latensi")
+    parser.add_argument('folder', help="folder dataset")
+    parser.add_argument('--topics', type=int, nargs='+', default=[15])
+    parser.add_argument('--backends', nargs='+', default=['lsi'], choices=sorted(BACKENDS),
+                        help="lsi dan runtime memakai proyeksi fold-in yang sama: kualitas identik, "
+                             "yang dibandingkan hanya latensi")
+    parser.add_argument('--queries', help="file query (qid<TAB>teks); default dari kategori")
+    parser.add_argument('--qrels', help="file qrels format TREC")
+    parser.add_argument('--per-category', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=100)
+    args = parser.parse_args()
+
+    rows = sweep(args.folder, args.topics, args.backends, args.queries, args.qrels,
+                 args.per_category, args.depth)
+    print()
+    print(format_table(rows))
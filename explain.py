@@ -0,0 +1,79 @@
+import numpy as np
+
+
+# Penjelasan skor untuk beberapa dokumen hasil pencarian, hanya dari potongan
+# matriks yang relevan (pengganti display_lsi_details untuk index besar):
+# - term query: tf, idf, bobot TF-IDF ternormalisasi dan baris U-nya
+# - vektor LSI query (mentah dan ternormalisasi)
+# - koordinat topik tiap dokumen (baris V ternormalisasi dari index)
+# - kontribusi tiap topik ke skor cosine: q_k * d_k, jumlahnya = skor
+# doc_rows: baris vektor dokumen (ternormalisasi) untuk doc_ids, urutan sama.
+def explain_query(query_stems, doc_ids, doc_rows, token2id, idf, u, singular_values=None):
+    counts, id2token, unknown = {}, {}, []
+    for stem in query_stems:
+        term_id = token2id.get(stem)
+        if term_id is None or term_id >= len(u):
+            if stem not in unknown:
+                unknown.append(stem)
+            continue
+        counts[term_id] = counts.get(term_id, 0) + 1
+        id2token[term_id] = stem
+
+    ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    weights = tf * idf[ids]
+    norm = np.linalg.norm(weights)
+    if norm > 0:
+        weights = weights / norm
+
+    terms = [{'term': id2token[term_id], 'term_id': int(term_id), 'tf': int(tf[i]), 'idf': float(idf[term_id]),
+              'weight': float(weights[i]), 'u': u[term_id]}
+             for i, term_id in enumerate(ids.tolist())]
+
+    query_vec = weights @ u[ids] if len(ids) else np.zeros(u.shape[1])
+    query_norm = np.linalg.norm(query_vec)
+    query_unit = query_vec / query_norm if query_norm > 0 else query_vec
+
+    documents = []
+    for doc_id, row in zip(doc_ids, doc_rows):
+        contributions = query_unit * row
+        documents.append({
+            'doc_id': int(doc_id),
+            'vector': row,
+            'score': float(contributions.sum()),
+            'contributions': contributions,
+        })
+
+    return {
+        'terms': terms,
+        'unknown': unknown,
+        'query_vector': query_vec,
+        'query_unit': query_unit,
+        'singular_values': singular_values,
+        'documents': documents,
+    }
+
+
+def format_explanation(explanation, file_names=None, top_topics=3):
+    lines = ["=== Term query (TF-IDF) ==="]
+    for t in explanation['terms']:
+        lines.append(f"    {t['term']:<15} tf {t['tf']} | idf {t['idf']:.3f} | bobot {t['weight']:.3f}")
+    if explanation['unknown']:
+        lines.append(f"    (tidak dikenal: {', '.join(explanation['unknown'])})")
+
+    query_unit = explanation['query_unit']
+    lines.append("=== Vektor query (LSI) ===")
+    lines.append("    " + ' '.join(f"T{k}:{v:+.3f}" for k, v in enumerate(query_unit)))
+    if explanation['singular_values'] is not None:
+        lines.append("    S: " + ' '.join(f"{v:.2f}" for v in explanation['singular_values']))
+
+    lines.append("=== Dokumen ===")
+    for doc in explanation['documents']:
+        name = file_names[doc['doc_id']] if file_names else f"Doc_{doc['doc_id']}"
+        lines.append(f"    {name} | Score: {doc['score']:.4f}")
+        for k in np.argsort(-np.abs(doc['contributions']))[:top_topics]:
+            lines.append(f"        T{k}: query {query_unit[k]:+.3f} x dokumen {doc['vector'][k]:+.3f}"
+                         f" = {doc['contributions'][k]:+.4f}")
+        if 'tf' in doc:
+            lines.append("        tf: " + ', '.join(f"{term}={count}" for term, count in doc['tf'].items()))
+    return '\n'.join(lines)
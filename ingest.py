@@ -0,0 +1,316 @@
+import argparse
+import functools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import numpy as np
+from progress import Progress, format_formats
+from metadata import DocumentMetadata, load_metadata_file, extract_metadata
+from positional import PositionalIndex
+
+# Tahap yang berjalan di proses terpisah; writer (BoW) selalu satu, di proses utama,
+# karena dictionary harus memberi term id secara berurutan.
+STAGES = ('reader', 'extractor', 'preprocessor')
+DEFAULT_WORKERS = {'reader': 1, 'extractor': 2, 'preprocessor': 2}
+
+# slot counter bersama per tahap: item, detik sibuk, detik tertahan di put (backpressure)
+COUNTERS = 3
+
+# hasil kosong per tahap (setelah seq, path), diteruskan jika handle gagal
+# supaya seq tersebut tetap sampai ke writer
+EMPTY = {
+    'reader': (0.0, b''),
+    'extractor': (0.0, "", 0.0, 0),
+    'preprocessor': (0.0, "", 0.0, 0, None, None, None),
+}
+
+
+# reader: I/O disk saja, (seq, path) -> (seq, path, mtime, bytes)
+def _reader_stage():
+    def handle(item):
+        seq, path = item
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            return seq, path, os.path.getmtime(path), data
+        except OSError as e:
+            print(f"[ERROR] Gagal membaca {path}: {e}")
+            return seq, path, 0.0, b''
+    return handle
+
+
+# extractor: parsing txt/docx/pdf dari bytes -> teks
+def _extractor_stage():
+    from pipeline import Pipeline
+    reader = Pipeline()
+
+    def handle(item):
+        seq, path, mtime, data = item
+        t0 = time.perf_counter()
+        content = reader.read_bytes(os.path.basename(path), data) if data else ""
+        return seq, path, mtime, content, time.perf_counter() - t0, len(content.encode('utf-8'))
+    return handle
+
+
+# preprocessor: tokenize -> stopword -> stemming (+ posisi) dan metadata
+def _preprocessor_stage(positional, sidecar):
+    from pipeline import Pipeline
+    reader = Pipeline()
+
+    def handle(item):
+        seq, path, mtime, content, seconds, nbytes = item
+        name = os.path.basename(path)
+        stems, positions, record = None, None, None
+        # dokumen kosong tetap diteruskan (stems None) supaya urutan seq tidak macet
+        if content.strip():
+            if positional:
+                stems, positions = reader.preprocess_positions(content)
+            else:
+                stems = reader.preprocess(content)
+            record = extract_metadata(name, content, sidecar.get(name))
+        return seq, path, mtime, content, seconds, nbytes, stems, positions, record
+    return handle
+
+
+def _run_stage(factory, empty, inbox, outbox, counters, slot):
+    handle = factory()
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        t0 = time.perf_counter()
+        try:
+            result = handle(item)
+        except Exception as e:
+            print(f"[ERROR] Gagal memproses {item[1]}: {e}")
+            result = item[:2] + empty
+        t1 = time.perf_counter()
+        # blok jika antrian berikutnya penuh: tahap lambat menahan tahap sebelumnya
+        outbox.put(result)
+        t2 = time.perf_counter()
+        with counters.get_lock():
+            counters[slot] += 1
+            counters[slot + 1] += t1 - t0
+            counters[slot + 2] += t2 - t1
+
+
+def _queue_depth(q):
+    try:
+        return q.qsize()
+    except NotImplementedError:  # macOS
+        return -1
+
+
+# Ingest bertahap: reader -> extractor -> preprocessor -> writer (BoW),
+# dihubungkan antrian multiprocessing berukuran tetap (queue_size) sehingga
+# jumlah dokumen yang sedang diproses antar tahap tetap terbatas. Hasilnya
+# mengisi Pipeline `ir` (file_names, raw_contents, metadata, ...) dengan urutan
+# yang sama seperti read_directory, plus dictionary + corpus BoW.
+# Pelatihan LSI (Pipeline.build_from_bow) baru dimulai setelah ingest selesai:
+# bobot TF-IDF butuh document frequency seluruh korpus, jadi corpus BoW dan
+# raw_contents tetap dikumpulkan penuh di memori (stems per dokumen tidak).
+class StagedIngest:
+    def __init__(self, ir, workers=None, queue_size=64, progress=None, positional=False, interval=2.0):
+        self.ir = ir
+        self.workers = dict(DEFAULT_WORKERS)
+        self.workers.update(workers if isinstance(workers, dict) else {})
+        self.queue_size = queue_size
+        self.progress = progress or Progress()
+        self.positional = positional
+        self.interval = interval
+
+        self.queues = []
+        self.counters = None
+        self.max_depth = [0] * (len(STAGES) + 1)
+        self.writer_items = 0
+        self.writer_busy = 0.0
+        self.started = 0.0
+        self.last_report = 0.0
+
+    def run(self, folder_path):
+        from gensim import corpora
+        from pipeline import make_snippet
+
+        print(f"[*] Ingest bertahap dari folder: '{folder_path}' "
+              f"({', '.join(f'{s} x{self.workers[s]}' for s in STAGES)}, antrian {self.queue_size})...")
+        ir = self.ir
+        ir.file_names, ir.file_paths, ir.file_mtimes, ir.raw_contents, ir.snippets = [], [], [], [], []
+        ir.metadata = DocumentMetadata()
+        ir.positional = PositionalIndex() if self.positional else None
+        dictionary = corpora.Dictionary()
+        corpus_bow = []
+        records = []
+
+        file_paths = ir.list_files(folder_path)
+        sidecar = load_metadata_file(folder_path)
+        factories = [
+            _reader_stage,
+            _extractor_stage,
+            functools.partial(_preprocessor_stage, self.positional, sidecar),
+        ]
+
+        # queues[i] masuk ke tahap i; queues[-1] masuk ke writer
+        self.queues = [mp.Queue(self.queue_size) for _ in range(len(STAGES) + 1)]
+        self.counters = mp.Array('d', len(STAGES) * COUNTERS)
+        processes = []
+        for i, stage in enumerate(STAGES):
+            processes.append([mp.Process(target=_run_stage, daemon=True,
+                                         args=(factories[i], EMPTY[stage], self.queues[i], self.queues[i + 1],
+                                               self.counters, i * COUNTERS))
+                              for _ in range(self.workers[stage])])
+            for p in processes[-1]:
+                p.start()
+
+        # jendela in-flight: feeder mengambil token sebelum tiap put, writer
+        # mengembalikannya saat seq di-commit, sehingga buffer urut-ulang di
+        # writer tidak pernah lebih besar dari kapasitas seluruh antrian
+        window = threading.Semaphore(self.queue_size * (len(STAGES) + 1))
+
+        # feeder: isi antrian pertama, lalu teruskan sinyal selesai tahap demi tahap
+        def feed():
+            for seq, path in enumerate(file_paths):
+                window.acquire()
+                self.queues[0].put((seq, path))
+            for i, stage_processes in enumerate(processes):
+                for _ in stage_processes:
+                    self.queues[i].put(None)
+                for p in stage_processes:
+                    p.join()
+            self.queues[-1].put(None)
+
+        self.progress.start('ingest', len(file_paths))
+        self.started = self.last_report = time.perf_counter()
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        # writer: urutkan kembali menurut seq, lalu doc2bow ke dictionary bersama
+        pending = {}
+        next_seq = 0
+        try:
+            while True:
+                try:
+                    item = self.queues[-1].get(timeout=self.interval)
+                except queue.Empty:
+                    dead = [p for stage_processes in processes for p in stage_processes
+                            if p.exitcode not in (None, 0)]
+                    if dead:
+                        raise RuntimeError(f"{len(dead)} worker ingest berhenti tidak normal "
+                                           f"(exit code {dead[0].exitcode}); dokumen seq {next_seq} hilang")
+                    self._report()
+                    continue
+                if item is None:
+                    break
+                pending[item[0]] = item
+                while next_seq in pending:
+                    t0 = time.perf_counter()
+                    seq, path, mtime, content, seconds, nbytes, stems, positions, record = pending.pop(next_seq)
+                    next_seq += 1
+                    window.release()
+                    name = os.path.basename(path)
+                    self.progress.record_format(name.rsplit('.', 1)[-1], seconds, nbytes)
+                    if stems is not None:
+                        if ir.positional is not None:
+                            ir.positional.add_document(len(ir.file_names), stems, positions)
+                        corpus_bow.append(dictionary.doc2bow(stems, allow_update=True))
+                        ir.file_names.append(name)
+                        ir.file_paths.append(path)
+                        ir.file_mtimes.append(mtime)
+                        ir.raw_contents.append(content)
+                        ir.snippets.append(make_snippet(content))
+                        records.append(record)
+                    self.writer_items += 1
+                    self.writer_busy += time.perf_counter() - t0
+                    self.progress.advance(bytes=nbytes, tokens=len(stems or ()))
+                self._sample_depths()
+                if time.perf_counter() - self.last_report >= self.interval:
+                    self._report()
+            feeder.join()
+            if next_seq != len(file_paths) or pending:
+                raise RuntimeError(f"Ingest tidak lengkap: {next_seq}/{len(file_paths)} dokumen di-commit, "
+                                   f"{len(pending)} tertahan di buffer")
+        finally:
+            for stage_processes in processes:
+                for p in stage_processes:
+                    if p.is_alive():
+                        p.terminate()
+
+        ir.metadata.add(records)
+        ir.deleted = np.zeros(len(ir.file_names), dtype=bool)
+        if ir.positional is not None:
+            ir.positional.freeze()
+        self.progress.finish()
+        print(format_formats(self.progress.snapshot()))
+        self._report()
+        print(f"[*] Tahap paling sibuk (bottleneck): {self.bottleneck()}")
+        print(f"[*] Selesai ingest. Ditemukan {len(ir.raw_contents)} dokumen valid.")
+        return dictionary, corpus_bow
+
+    def _sample_depths(self):
+        for i, q in enumerate(self.queues):
+            self.max_depth[i] = max(self.max_depth[i], _queue_depth(q))
+
+    # per tahap: jumlah item, throughput, utilisasi worker, waktu tertahan, isi antrian masuk
+    def metrics(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        values = list(self.counters) if self.counters is not None else [0.0] * len(STAGES) * COUNTERS
+        result = {}
+        for i, stage in enumerate(STAGES + ('writer',)):
+            if stage == 'writer':
+                items, busy, blocked, workers = self.writer_items, self.writer_busy, 0.0, 1
+            else:
+                items, busy, blocked = values[i * COUNTERS:(i + 1) * COUNTERS]
+                workers = self.workers[stage]
+            result[stage] = {
+                'workers': workers,
+                'items': int(items),
+                'rate': items / elapsed,
+                'busy': busy / (elapsed * workers),
+                'blocked': blocked / (elapsed * workers),
+                'queue': _queue_depth(self.queues[i]) if self.queues else 0,
+                'queue_max': self.max_depth[i],
+            }
+        return result
+
+    # tahap dengan utilisasi worker tertinggi
+    def bottleneck(self):
+        metrics = self.metrics()
+        return max(metrics, key=lambda stage: metrics[stage]['busy'])
+
+    def _report(self):
+        self.last_report = time.perf_counter()
+        print(format_stages(self.metrics(), self.queue_size))
+
+
+def format_stages(metrics, queue_size):
+    lines = []
+    for stage, m in metrics.items():
+        lines.append(f"    {stage:<12} x{m['workers']} | {m['items']} item ({m['rate']:.1f}/s) | "
+                     f"sibuk {100 * m['busy']:.0f}% | tertahan {100 * m['blocked']:.0f}% | "
+                     f"antrian {m['queue']}/{queue_size} (maks {m['queue_max']})")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    from pipeline import Pipeline
+
+    parser = argparse.ArgumentParser(description="Build model dengan ingest bertahap multi-proses")
+    parser.add_argument('folder', help="folder dataset")
+    parser.add_argument('--model', default='ir_model.pkl')
+    parser.add_argument('--index', default='ir_index.npz')
+    parser.add_argument('--topics', type=int, default=15)
+    for stage in STAGES:
+        parser.add_argument(f'--{stage}', type=int, default=DEFAULT_WORKERS[stage], help=f"jumlah proses {stage}")
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--positional', action='store_true', help="bangun index posisional (query frasa)")
+    args = parser.parse_args()
+
+    ir = Pipeline()
+    progress = Progress()
+    workers = {stage: getattr(args, stage) for stage in STAGES}
+    dictionary, corpus_bow = StagedIngest(ir, workers, args.queue_size, progress, args.positional).run(args.folder)
+    if ir.raw_contents:
+        ir.build_from_bow(dictionary, corpus_bow, args.topics, progress)
+        ir.save_model(args.model)
+        ir.export_index(args.index)
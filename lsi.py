@@ -1,32 +1,128 @@
 from gensim import corpora, models, similarities, matutils
-import pandas as pd
 import numpy as np
+from ranking import top_k, project_query
+from explain import explain_query
 
 class LSIRetrieval:
-    def __init__(self, cleaned_docs_list, num_topics=15):
+    def __init__(self, cleaned_docs_list, num_topics=15, progress=None, chunksize=20000):
         self.cleaned_docs_list = cleaned_docs_list
         self.dictionary = corpora.Dictionary(self.cleaned_docs_list)
         
         # 1. Bag of Words (BoW)
         self.corpus_bow = [self.dictionary.doc2bow(doc) for doc in self.cleaned_docs_list]
-        
+        self._train(num_topics, progress, chunksize)
+
+    # model dari dictionary + BoW yang sudah jadi (hasil ingest.py),
+    # token hasil stemming tidak perlu disimpan seluruhnya di memori
+    @classmethod
+    def from_bow(cls, dictionary, corpus_bow, num_topics=15, progress=None, chunksize=20000):
+        engine = cls.__new__(cls)
+        engine.cleaned_docs_list = []
+        engine.dictionary = dictionary
+        engine.corpus_bow = corpus_bow
+        engine._train(num_topics, progress, chunksize)
+        return engine
+
+    def _train(self, num_topics, progress, chunksize):
         # 2. TF-IDF Transformation
         self.tfidf_model = models.TfidfModel(self.corpus_bow)
         self.corpus_tfidf = self.tfidf_model[self.corpus_bow]
         
         # 3. LSI Model (SVD) - num_topics diset 8 sesuai jumlah kategori
+        # Dilatih per chunk (setara dengan chunking internal gensim)
+        # supaya progres tiap chunk bisa dilaporkan.
         self.lsi_model = models.LsiModel(
-            self.corpus_tfidf, 
             id2word=self.dictionary, 
-            num_topics=num_topics
+            num_topics=num_topics,
+            chunksize=chunksize
         )
+        num_chunks = (len(self.corpus_bow) + chunksize - 1) // chunksize
+        if progress: progress.start('lsi', num_chunks)
+        for start in range(0, len(self.corpus_bow), chunksize):
+            chunk = self.corpus_bow[start:start + chunksize]
+            self.lsi_model.add_documents(self.tfidf_model[chunk])
+            if progress: progress.advance(docs=len(chunk))
+        if progress: progress.finish()
         
         # 4. Similarity Index
         self.index = similarities.MatrixSimilarity(self.lsi_model[self.corpus_tfidf])
 
+    # fold-in dokumen baru dengan model TF-IDF/LSI yang ada (tanpa melatih ulang SVD).
+    # Kata baru dicatat di dictionary, tapi tidak ikut proyeksi LSI.
+    def add_documents(self, cleaned_docs):
+        new_bow = [self.dictionary.doc2bow(doc, allow_update=True) for doc in cleaned_docs]
+        self.cleaned_docs_list.extend(cleaned_docs)
+        self.corpus_bow.extend(new_bow)
+
+        new_lsi = self.lsi_model[self.tfidf_model[new_bow]]
+        vectors = matutils.corpus2dense(new_lsi, num_terms=self.lsi_model.num_topics, num_docs=len(new_bow)).T
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        self.index.index = np.vstack([self.index.index, vectors.astype(self.index.index.dtype)])
+        return new_bow
+
+    # Tabel fold-in per term (dihitung sekali, lalu di-cache): baris U dikali idf.
+    # LsiModel dipakai dengan scaled=False, jadi baris U tidak dibagi singular value.
+    def fold_in_table(self):
+        if getattr(self, '_fold_in', None) is None:
+            num_terms = self.lsi_model.num_terms
+            u = self.lsi_model.projection.u[:, :self.lsi_model.num_topics]
+            self._idf = np.zeros(num_terms, dtype=u.dtype)
+            for term_id, value in self.tfidf_model.idfs.items():
+                if abs(value) > 1e-12:
+                    self._idf[term_id] = value
+            self._fold_in = self._idf[:, None] * u
+        return self._fold_in
+
+    # vektor LSI query (setara lsi_model[tfidf_model[doc2bow(stems)]]) atau None
+    def project(self, search_query):
+        fold_in = self.fold_in_table()
+        return project_query(search_query, self.dictionary.token2id, self._idf, fold_in)
+
+    # vektor LSI query ternormalisasi atau None jika tidak ada kata yang dikenal
+    def query_vector(self, search_query):
+        query_vec = self.project(search_query)
+        if query_vec is None:
+            return None
+        norm = np.linalg.norm(query_vec)
+        return (query_vec / norm).astype(self.index.index.dtype) if norm > 0 else None
+
+    # pencarian cepat tanpa mencetak matriks debug
+    # mask: boolean per dokumen (lihat DocumentMetadata.mask), diterapkan sebelum top-k
+    def search(self, search_query, top_n=10, mask=None):
+        query_vec = self.query_vector(search_query)
+        if query_vec is None:
+            return []
+        return top_k(self.index.index, query_vec, top_n, mask)
+
+    # penjelasan skor query untuk doc_ids tertentu (lihat explain.py),
+    # hanya membaca baris U untuk term query dan baris index untuk doc_ids
+    def explain(self, search_query, doc_ids):
+        self.fold_in_table()
+        num_topics = self.lsi_model.num_topics
+        return explain_query(search_query, doc_ids, self.index.index[list(doc_ids)], self.dictionary.token2id,
+                             self._idf, self.lsi_model.projection.u[:, :num_topics],
+                             self.lsi_model.projection.s[:num_topics])
+
+    # menyiapkan array NumPy untuk runtime pencarian (search_runtime.py)
+    def export_arrays(self):
+        # hanya term yang dikenal model LSI (dictionary bisa bertambah lewat add_documents)
+        self.fold_in_table()
+        num_terms = self.lsi_model.num_terms
+
+        return {
+            'vocab': np.array([self.dictionary[i] for i in range(num_terms)]),
+            'idf': self._idf.astype(np.float32),
+            'u': self.lsi_model.projection.u[:, :self.lsi_model.num_topics].astype(np.float32),
+            's': self.lsi_model.projection.s[:self.lsi_model.num_topics],
+            'doc_vectors': self.index.index,
+        }
+
     def display_lsi_details(self, search_query):
+        # pandas hanya dipakai untuk tampilan debug
+        import pandas as pd
         words = [self.dictionary[i] for i in range(len(self.dictionary))]
-        doc_names = [f"Doc_{i}" for i in range(len(self.cleaned_docs_list))]
+        doc_names = [f"Doc_{i}" for i in range(len(self.corpus_bow))]
 
         # --- A. BAG OF WORDS (BoW) ---
         print("=== 1. BAG OF WORDS (BoW) REPRESENTATION ===")
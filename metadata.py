@@ -0,0 +1,135 @@
+import csv
+import os
+import re
+import numpy as np
+
+# Field yang bisa dipakai sebagai filter/facet pencarian
+FIELDS = ('kategori', 'sumber', 'format')
+
+# File sidecar yang ditulis oleh data/create.py
+METADATA_FILE = 'metadata.csv'
+
+HEADER_PATTERNS = {
+    'kategori': re.compile(r'Kategori:\s*([^|\n]+)'),
+    'sumber': re.compile(r'Sumber:\s*([^|\n]+)'),
+}
+
+
+# membaca metadata.csv (jika ada): nama file -> dict field
+def load_metadata_file(folder_path):
+    path = os.path.join(folder_path, METADATA_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return {row['file']: row for row in csv.DictReader(f)}
+    except Exception as e:
+        print(f"Peringatan: Gagal membaca {path}: {e}")
+        return {}
+
+
+# bentuk baku nilai field: format huruf kecil, kategori/sumber Title Case;
+# dipakai saat menyimpan metadata maupun saat mencocokkan filter
+def normalize_value(field, value):
+    value = str(value).strip()
+    return value.lower() if field == 'format' else value.title()
+
+
+# metadata satu dokumen: dari sidecar, atau dari baris "Kategori: .. | Sumber: .."
+# yang ditulis create.py di awal file docx/pdf
+def extract_metadata(file_name, content, sidecar=None):
+    record = {'format': normalize_value('format', file_name.rsplit('.', 1)[-1])}
+    sidecar = sidecar or {}
+    head = content[:500]
+    for field, pattern in HEADER_PATTERNS.items():
+        value = sidecar.get(field)
+        if not value:
+            match = pattern.search(head)
+            value = match.group(1) if match else ''
+        record[field] = normalize_value(field, value)
+    return record
+
+
+# field yang masih kosong diisi dari record versi lama dokumen yang sama
+def inherit_metadata(record, previous):
+    for field, value in (previous or {}).items():
+        if not record.get(field):
+            record[field] = value
+    return record
+
+
+# Metadata per dokumen disimpan sebagai kode integer per field,
+# ditambah boolean mask per nilai yang sudah dihitung di depan
+# sehingga filter cukup berupa operasi OR/AND antar mask.
+class DocumentMetadata:
+    def __init__(self):
+        self.values = {field: [] for field in FIELDS}
+        self.codes = {field: np.zeros(0, dtype=np.int32) for field in FIELDS}
+        self.masks = {field: [] for field in FIELDS}
+
+    def __len__(self):
+        return len(self.codes[FIELDS[0]])
+
+    def add(self, records):
+        for field in FIELDS:
+            lookup = {value: i for i, value in enumerate(self.values[field])}
+            new_codes = []
+            for record in records:
+                value = record.get(field, '')
+                if value not in lookup:
+                    lookup[value] = len(self.values[field])
+                    self.values[field].append(value)
+                new_codes.append(lookup[value])
+            self.codes[field] = np.concatenate([self.codes[field], np.array(new_codes, dtype=np.int32)])
+        self._build_masks()
+
+    def _build_masks(self):
+        for field in FIELDS:
+            codes = self.codes[field]
+            self.masks[field] = [codes == i for i in range(len(self.values[field]))]
+
+    # filters: {'kategori': 'Olahraga', 'format': ['pdf', 'docx']} -> boolean mask / None
+    # nilai dinormalisasi seperti saat disimpan ('olahraga' == 'Olahraga');
+    # field yang tidak dikenal -> ValueError (bukan diam-diam diabaikan)
+    def mask(self, filters):
+        if not filters:
+            return None
+        unknown = [field for field in filters if field not in self.values]
+        if unknown:
+            raise ValueError(f"Field filter tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(FIELDS)})")
+        result = np.ones(len(self), dtype=bool)
+        for field, wanted in filters.items():
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            field_mask = np.zeros(len(self), dtype=bool)
+            for value in wanted:
+                value = normalize_value(field, value)
+                if value in self.values[field]:
+                    field_mask |= self.masks[field][self.values[field].index(value)]
+            result &= field_mask
+        return result
+
+    # jumlah dokumen per nilai field (opsional dibatasi mask)
+    def facet_counts(self, field, mask=None):
+        codes = self.codes[field] if mask is None else self.codes[field][mask]
+        counts = np.bincount(codes, minlength=len(self.values[field]))
+        return {value: int(count) for value, count in zip(self.values[field], counts)}
+
+    def record(self, doc_id):
+        return {field: self.values[field][self.codes[field][doc_id]] for field in FIELDS}
+
+    def to_arrays(self, prefix='meta_'):
+        arrays = {}
+        for field in FIELDS:
+            arrays[f'{prefix}{field}_values'] = np.array(self.values[field], dtype=str)
+            arrays[f'{prefix}{field}_codes'] = self.codes[field]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data, prefix='meta_'):
+        metadata = cls()
+        for field in FIELDS:
+            metadata.values[field] = data[f'{prefix}{field}_values'].tolist()
+            metadata.codes[field] = data[f'{prefix}{field}_codes']
+        metadata._build_masks()
+        return metadata
@@ -1,9 +1,24 @@
+import io
 import os
 import pickle
 import re
-from lsi import LSIRetrieval
-from docx import Document
-from pypdf import PdfReader
+import time
+import numpy as np
+from progress import Progress, format_formats
+from corpus_stats import CorpusStats
+from metadata import DocumentMetadata, load_metadata_file, extract_metadata, inherit_metadata
+from positional import PositionalIndex
+from spelling import SpellIndex
+from clustering import DocumentClusters
+from ranking import SearchResults, normalized_query, combined_mask, rank_documents
+
+# gensim, python-docx dan pypdf sengaja diimport di dalam method (lazy)
+# supaya runtime pencarian (search_runtime.py) tidak ikut memuatnya.
+
+
+# potongan awal dokumen untuk ditampilkan di hasil pencarian
+def make_snippet(content):
+    return content[:200].replace('\n', ' ')
 
 
 class Tokenizer:
@@ -25,11 +40,12 @@ class Stopword:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 # Membaca setiap baris, menghapus spasi/newline, dan filter baris kosong
-                stopwords = {line.strip() for line in f if line.strip()}
+                # frozenset: dipakai bersama (tanpa salin) oleh snapshot SearchIndex
+                stopwords = frozenset(line.strip() for line in f if line.strip())
             return stopwords
         except FileNotFoundError:
             print(f"Peringatan: File {file_path} tidak ditemukan. Stopword removal akan kosong.")
-            return set()
+            return frozenset()
 
     def remove(self, tokens):
         return [word for word in tokens if word not in self.daftar_stopword]
@@ -49,8 +65,17 @@ class Pipeline:
         
         # Temporary variabel
         self.file_names = []
+        self.file_paths = []
+        self.file_mtimes = []
         self.raw_contents = []
+        self.snippets = []
+        self.deleted = np.zeros(0, dtype=bool)
         self.engine = None
+        self.stats = None
+        self.metadata = DocumentMetadata()
+        self.positional = None
+        self.spell = None
+        self.clusters = None
 
     # menjalankan proses tokenizing,stopword removal dan stemming
     def preprocess(self, teks):
@@ -58,6 +83,15 @@ class Pipeline:
         clen_tokens = self.stopword.remove(tokens)
         return [self.stemmer.stemWord(k) for k in clen_tokens]
 
+    # seperti preprocess, tapi juga mengembalikan posisi token asli (sebelum stopword removal)
+    def preprocess_positions(self, teks):
+        stems, positions = [], []
+        for pos, token in enumerate(self.tokenizer.tokenize(teks)):
+            if token not in self.stopword.daftar_stopword:
+                stems.append(self.stemmer.stemWord(token))
+                positions.append(pos)
+        return stems, positions
+
     # method untuk membaca file ekstensi .txt
     def read_txt(self,file_path):
         try:
@@ -71,6 +105,7 @@ class Pipeline:
     # method untuk membaca file ekstensi .docx
     def read_docx(self, file_path):
         try:
+            from docx import Document
             doc = Document(file_path)
             full_text = []
             for para in doc.paragraphs:
@@ -83,6 +118,7 @@ class Pipeline:
     # method untuk membaca file ekstensi .pdf
     def read_pdf(self, file_path):
         try:
+            from pypdf import PdfReader
             reader = PdfReader(file_path)
             full_text = []
             for page in reader.pages:
@@ -95,32 +131,81 @@ class Pipeline:
             print(f"Error baca PDF {file_path}: {e}")
             return ""
 
+    # method untuk membaca satu file sesuai ekstensinya
+    def read_file(self, file_path):
+        if file_path.endswith(".txt"):
+            return self.read_txt(file_path)
+        if file_path.endswith(".docx"):
+            return self.read_docx(file_path)
+        if file_path.endswith(".pdf"):
+            return self.read_pdf(file_path)
+        return ""
+
+    # seperti read_file, tapi dari isi file yang sudah dibaca ke memori (lihat ingest.py)
+    def read_bytes(self, file_name, data):
+        if file_name.endswith(".txt"):
+            try:
+                return data.decode('utf-8')
+            except UnicodeDecodeError as e:
+                print(f"[ERROR] Gagal TXT {file_name}: {e}")
+                return ""
+        if file_name.endswith(".docx"):
+            return self.read_docx(io.BytesIO(data))
+        if file_name.endswith(".pdf"):
+            return self.read_pdf(io.BytesIO(data))
+        return ""
+
+    # daftar file dokumen di folder (urutan tetap, jadi doc id bisa direproduksi)
+    def list_files(self, folder_path):
+        file_paths = []
+        for root, _, files in os.walk(folder_path):
+            for file in sorted(files):
+                if file.endswith((".txt", ".pdf")) or (file.endswith(".docx") and not file.startswith("~")):
+                    file_paths.append(os.path.join(root, file))
+        return file_paths
+
     # method untuk membaca direktori     
-    def read_directory(self, folder_path):
+    def read_directory(self, folder_path, progress=None):
             print(f"[*] Membaca file dari folder: '{folder_path}'...")
+            progress = progress or Progress()
             
             # Reset data lama jika ada
             self.file_names = []
+            self.file_paths = []
+            self.file_mtimes = []
             self.raw_contents = []
+            self.snippets = []
+            self.metadata = DocumentMetadata()
+            sidecar = load_metadata_file(folder_path)
+            records = []
 
-            for root, _, files in os.walk(folder_path):
-                for file in sorted(files):
-                    file_path = os.path.join(root, file)
-                    content = ""
-                    
-                    # Cek ekstensi dan baca
-                    if file.endswith(".txt"):
-                        content = self.read_txt(file_path)
-                    elif file.endswith(".docx") and not file.startswith("~"):
-                        content = self.read_docx(file_path)
-                    elif file.endswith(".pdf"):
-                        content = self.read_pdf(file_path)
-                    
-                    # Jika konten valid, simpan
-                    if content.strip():
-                        self.file_names.append(file)
-                        self.raw_contents.append(content)
+            # Kumpulkan daftar file dulu agar total (dan ETA) diketahui
+            file_paths = self.list_files(folder_path)
 
+            progress.start('baca', len(file_paths))
+            for file_path in file_paths:
+                file = os.path.basename(file_path)
+                ext = file.rsplit('.', 1)[-1]
+                t0 = time.perf_counter()
+
+                content = self.read_file(file_path)
+                nbytes = len(content.encode('utf-8'))
+                progress.record_format(ext, time.perf_counter() - t0, nbytes)
+                progress.advance(bytes=nbytes)
+                
+                # Jika konten valid, simpan
+                if content.strip():
+                    self.file_names.append(file)
+                    self.file_paths.append(file_path)
+                    self.file_mtimes.append(os.path.getmtime(file_path))
+                    self.raw_contents.append(content)
+                    self.snippets.append(make_snippet(content))
+                    records.append(extract_metadata(file, content, sidecar.get(file)))
+
+            self.metadata.add(records)
+            self.deleted = np.zeros(len(self.file_names), dtype=bool)
+            progress.finish()
+            print(format_formats(progress.snapshot()))
             print(f"[*] Selesai membaca. Ditemukan {len(self.raw_contents)} dokumen valid.")
         
 
@@ -129,7 +214,15 @@ class Pipeline:
         print(f"Menyimpan model ke '{filepath}'...")
         data = {
             'engine': self.engine,
+            'stats': self.stats,
+            'metadata': self.metadata,
+            'positional': self.positional,
+            'spell': self.spell,
+            'clusters': self.clusters,
             'file_names': self.file_names,
+            'file_paths': self.file_paths,
+            'file_mtimes': self.file_mtimes,
+            'deleted': self.deleted,
             'raw_contents': self.raw_contents
         }
         try:
@@ -139,54 +232,298 @@ class Pipeline:
         except Exception as e:
             print(f"Gagal menyimpan model: {e}")
 
+    # menyimpan index siap-cari (array NumPy) untuk SearchRuntime
+    def export_index(self, filepath='ir_index.npz'):
+        if not self.engine: return
+        print(f"Menyimpan index pencarian ke '{filepath}'...")
+        arrays = self.engine.export_arrays()
+        arrays['file_names'] = np.array(self.file_names)
+        arrays['snippets'] = np.array(self.snippets)
+        arrays['deleted'] = self.deleted
+        arrays['file_mtimes'] = np.array(self.file_mtimes, dtype=np.float64)
+        if self.stats:
+            arrays.update(self.stats.to_arrays())
+        arrays.update(self.metadata.to_arrays())
+        if self.spell is not None:
+            arrays.update(self.spell.to_arrays())
+        if self.clusters is not None:
+            arrays.update(self.clusters.to_arrays())
+        try:
+            np.savez(filepath, **arrays)
+            print("Index berhasil disimpan.")
+        except Exception as e:
+            print(f"Gagal menyimpan index: {e}")
+
     def load_model(self, filepath='ir_model.pkl'):
         print(f"Memuat model dari '{filepath}'...")
         try:
             with open(filepath, 'rb') as f:
                 data = pickle.load(f)
                 self.engine = data['engine']
+                self.stats = data.get('stats')
+                self.metadata = data.get('metadata') or DocumentMetadata()
+                self.positional = data.get('positional')
+                self.spell = data.get('spell')
+                self.clusters = data.get('clusters')
                 self.file_names = data['file_names']
                 self.raw_contents = data['raw_contents']
+                self.snippets = [make_snippet(content) for content in self.raw_contents]
+                self.file_paths = data.get('file_paths', [])
+                self.file_mtimes = data.get('file_mtimes', [])
+                self.deleted = data.get('deleted', np.zeros(len(self.file_names), dtype=bool))
             print("Model berhasil dimuat!")
             return True
         except Exception as e:
             print(f"Gagal memuat model: {e}")
             return False
 
-    def run(self, folder_path, num_topics=15, model_path='ir_model.pkl'):
-        # 1. Baca Dokumen
-        self.read_directory(folder_path)
-        
-        if not self.raw_contents:
-            print("[!] Proses dihentikan karena tidak ada dokumen.")
-            return
-
-        # 2. Preprocessing
+    # preprocessing seluruh raw_contents -> list token hasil stemming per dokumen
+    # positional=True sekaligus membangun index posisional (untuk query frasa)
+    def preprocess_all(self, progress=None, positional=False):
+        progress = progress or Progress()
         print("[*] Memulai Preprocessing (Tokenize -> Stopword -> Stemming)...")
+        progress.start('preprocess', len(self.raw_contents))
+        self.positional = PositionalIndex() if positional else None
         processed_docs = []
-        for content in self.raw_contents:
-            result = self.preprocess(content)
+        for doc_id, content in enumerate(self.raw_contents):
+            if self.positional is not None:
+                result, positions = self.preprocess_positions(content)
+                self.positional.add_document(doc_id, result, positions)
+            else:
+                result = self.preprocess(content)
             processed_docs.append(result)
+            progress.advance(tokens=len(result))
+        if self.positional is not None:
+            self.positional.freeze()
+        progress.finish()
         
         print(f"[*] Preprocessing selesai untuk {len(processed_docs)} dokumen.")
+        return processed_docs
+
+    # membangun engine LSI + statistik korpus dari dokumen yang sudah dipreprocess
+    def build(self, processed_docs, num_topics=15, progress=None):
+        print("[*] Membangun Model LSI (SVD)...")
+        from lsi import LSIRetrieval
+        self.engine = LSIRetrieval(list(processed_docs), num_topics, progress=progress)
+        self._build_stats()
 
-        # 3. LSI 
+    # seperti build, dari dictionary + BoW hasil ingest bertahap (ingest.py)
+    def build_from_bow(self, dictionary, corpus_bow, num_topics=15, progress=None):
         print("[*] Membangun Model LSI (SVD)...")
-        self.engine = LSIRetrieval(processed_docs, num_topics)
+        from lsi import LSIRetrieval
+        self.engine = LSIRetrieval.from_bow(dictionary, corpus_bow, num_topics, progress=progress)
+        self._build_stats()
+
+    # statistik korpus + index ejaan dari engine yang baru dibangun
+    # (klaster lama tidak berlaku lagi untuk engine baru)
+    def _build_stats(self):
+        self.stats = CorpusStats.from_dictionary(self.engine.dictionary, self.engine.corpus_bow, self.file_names)
+        words = [self.engine.dictionary[i] for i in range(len(self.engine.dictionary))]
+        self.spell = SpellIndex.build(words, self.stats.cf)
+        self.clusters = None
+
+    # tahap offline: klaster dokumen dari vektor LSI (lihat clustering.py)
+    def cluster(self, num_clusters=20, batch_size=1024, progress=None):
+        if not self.engine: return
+        print(f"[*] Mengelompokkan dokumen ke {num_clusters} klaster (mini-batch k-means)...")
+        export = self.engine.export_arrays()
+        self.clusters = DocumentClusters.fit(self.engine.index.index, export['u'], export['vocab'].tolist(),
+                                             num_clusters, batch_size, mask=~self.deleted, progress=progress)
+
+    # anggota klaster: [(doc_id, kemiripan ke centroid)], paling representatif dulu
+    def browse(self, cluster_id, limit=None):
+        if self.clusters is None: return []
+        return self.clusters.members(cluster_id, lambda doc_ids: self.engine.index.index[doc_ids],
+                                     ~self.deleted, limit)
+
+    # progress: objek Progress (opsional), default mencetak throughput ke stdout
+    # workers: paralelisme per tahap, mis. {'extractor': 4, 'preprocessor': 4};
+    # jika diisi, baca + preprocessing berjalan bertahap di banyak proses (ingest.py)
+    def run(self, folder_path, num_topics=15, model_path='ir_model.pkl', index_path='ir_index.npz', progress=None,
+            positional=False, workers=None, num_clusters=None):
+        progress = progress or Progress()
+
+        if workers:
+            # 1+2. Baca & preprocessing paralel, langsung menjadi BoW
+            from ingest import StagedIngest
+            dictionary, corpus_bow = StagedIngest(self, workers, progress=progress, positional=positional).run(folder_path)
+            if not self.raw_contents:
+                print("[!] Proses dihentikan karena tidak ada dokumen.")
+                return
+
+            # 3. LSI
+            self.build_from_bow(dictionary, corpus_bow, num_topics, progress)
+        else:
+            # 1. Baca Dokumen
+            self.read_directory(folder_path, progress)
+
+            if not self.raw_contents:
+                print("[!] Proses dihentikan karena tidak ada dokumen.")
+                return
+
+            # 2. Preprocessing
+            processed_docs = self.preprocess_all(progress, positional)
+
+            # 3. LSI
+            self.build(processed_docs, num_topics, progress)
+
+        # 3b. Klaster (opsional)
+        if num_clusters:
+            self.cluster(num_clusters, progress=progress)
         
         # 4. Simpan
         self.save_model(model_path)
+        self.export_index(index_path)
         print("[*] Pipeline Selesai!")
 
-    def search(self, query):
+    # membaca + preprocessing file baru tanpa mengubah index (boleh di luar lock)
+    # sidecar: isi metadata.csv (nama file -> baris); previous: path -> record
+    # versi lama dokumen, cadangan untuk field yang tidak ada di sidecar/header
+    def prepare_documents(self, file_paths, sidecar=None, previous=None):
+        sidecar = sidecar or {}
+        previous = previous or {}
+        prepared = []
+        for file_path in file_paths:
+            content = self.read_file(file_path)
+            if not content.strip():
+                continue
+            name = os.path.basename(file_path)
+            stems, positions = self.preprocess_positions(content)
+            record = inherit_metadata(extract_metadata(name, content, sidecar.get(name)), previous.get(file_path))
+            prepared.append({
+                'path': file_path,
+                'name': name,
+                'mtime': os.path.getmtime(file_path),
+                'content': content,
+                'record': record,
+                'stems': stems,
+                'positions': positions,
+            })
+        return prepared
+
+    # record metadata versi terakhir (boleh sudah dihapus) untuk tiap path yang dikenal
+    def records_by_path(self, file_paths):
+        targets = set(file_paths)
+        return {path: self.metadata.record(doc_id) for doc_id, path in enumerate(self.file_paths) if path in targets}
+
+    # memasukkan hasil prepare_documents ke model (fold-in, tanpa build ulang SVD)
+    def apply_documents(self, prepared):
         if not self.engine:
             print("Error: Engine belum siap.")
-            return []
+            return 0
+        if not prepared: return 0
+
+        if self.positional is not None:
+            for doc_id, doc in enumerate(prepared, len(self.file_names)):
+                self.positional.add_document(doc_id, doc['stems'], doc['positions'])
+
+        names = [doc['name'] for doc in prepared]
+        new_bow = self.engine.add_documents([doc['stems'] for doc in prepared])
+        if self.stats:
+            self.stats.add_documents(new_bow, names, len(self.engine.dictionary))
+        self.metadata.add([doc['record'] for doc in prepared])
+        if self.clusters is not None:
+            self.clusters.add(self.engine.index.index[-len(prepared):])
+        self.file_names.extend(names)
+        self.file_paths.extend(doc['path'] for doc in prepared)
+        self.file_mtimes.extend(doc['mtime'] for doc in prepared)
+        self.raw_contents.extend(doc['content'] for doc in prepared)
+        self.snippets.extend(make_snippet(doc['content']) for doc in prepared)
+        self.deleted = np.concatenate([self.deleted, np.zeros(len(prepared), dtype=bool)])
+        # posting baru langsung dipadatkan selagi penulis masih memegang model,
+        # supaya query tidak pernah memicu _freeze
+        if self.positional is not None:
+            self.positional.freeze()
+        return len(prepared)
+
+    # menambah dokumen baru ke model yang sudah ada
+    def add_documents(self, file_paths):
+        return self.apply_documents(self.prepare_documents(file_paths))
+
+    # menandai dokumen (berdasarkan path) sebagai terhapus; vektornya tetap
+    # di index tapi selalu disaring sebelum top-k
+    def remove_documents(self, file_paths):
+        targets = set(file_paths)
+        doc_ids = [i for i, path in enumerate(self.file_paths) if path in targets and not self.deleted[i]]
+        if not doc_ids: return 0
+
+        self.deleted[doc_ids] = True
+        if self.stats:
+            self.stats.remove_documents(doc_ids, [self.engine.corpus_bow[i] for i in doc_ids],
+                                        [self.file_names[i] for i in doc_ids])
+        for i in doc_ids:
+            self.raw_contents[i] = ""
+            self.snippets[i] = ""
+        return len(doc_ids)
+
+    # mask filter metadata digabung dengan dokumen yang sudah dihapus
+    def search_mask(self, filters=None):
+        return combined_mask(self.metadata, self.deleted, filters)
+
+    # snapshot read-only untuk melayani query dari banyak thread (lihat search_index.py).
+    # Pipeline sendiri menyimpan state yang berubah saat build/update, jadi thread
+    # lain sebaiknya mencari lewat snapshot, bukan lewat Pipeline.search.
+    def snapshot(self):
+        if not self.engine: return None
+        from search_index import SearchIndex
+        return SearchIndex.from_pipeline(self)
+
+    # k kata dasar terbanyak dari statistik korpus: [(kata, frekuensi)]
+    def top_terms(self, k=500, by='cf'):
+        if not self.stats: return []
+        return [(self.engine.dictionary[term_id], count) for term_id, count in self.stats.top_terms(k, by)]
+
+    # penjelasan skor query untuk beberapa doc id hasil search (lihat explain.py);
+    # tiap dokumen juga diberi tf term query dari BoW-nya
+    def explain(self, query, doc_ids, correct=True):
+        if not self.engine:
+            print("Error: Engine belum siap.")
+            return None
 
-        print(f"Searching: {query}")
         query_stems = self.preprocess(query)
-        return self.engine.display_lsi_details(query_stems)
-    
+        if correct and self.spell is not None:
+            query_stems, _ = self.spell.correct_stems(
+                query_stems, lambda stem: stem in self.engine.dictionary.token2id)
+
+        explanation = self.engine.explain(query_stems, doc_ids)
+        term_ids = {t['term_id']: t['term'] for t in explanation['terms']}
+        for doc in explanation['documents']:
+            bow = dict(self.engine.corpus_bow[doc['doc_id']])
+            doc['tf'] = {term: bow.get(term_id, 0) for term_id, term in term_ids.items()}
+        return explanation
+
+    # details=True mencetak seluruh matriks BoW/TF/U/S/V (hanya untuk analisis)
+    # filters: {'kategori': 'Olahraga', 'format': ['pdf']}, diterapkan sebelum top-k
+    # Frasa dalam tanda kutip ("bank indonesia") dicocokkan dengan index posisional
+    # pada kandidat LSI: phrase_mode='filter' membuang yang tidak cocok,
+    # 'boost' menambah skor sebesar phrase_boost. proximity=N -> cukup dalam N kata.
+    # correct=True: stem yang tidak dikenal dikoreksi ke stem terdekat (results.corrections)
+    # route=N: skoring dibatasi ke dokumen di N klaster terdekat (perlu cluster())
+    def search(self, query, top_n=10, details=False, filters=None,
+               phrase_mode='filter', proximity=None, phrase_boost=0.5, candidates=200, correct=True, route=None):
+        if not self.engine:
+            print("Error: Engine belum siap.")
+            return SearchResults()
+
+        engine = self.engine
+        doc_vectors = engine.index.index
+        fold_in = engine.fold_in_table()
+        query_stems = self.preprocess(query)
+        query_vec, corrections = normalized_query(query_stems, engine.dictionary.token2id, engine._idf, fold_in,
+                                                  self.spell, correct, doc_vectors.dtype)
+
+        if details:
+            print(f"Searching: {query}")
+            return engine.display_lsi_details([corrections.get(stem, stem) for stem in query_stems])
+
+        if query_vec is None:
+            return SearchResults([], corrections)
+        mask = combined_mask(self.metadata, self.deleted, filters, self.clusters, query_vec, route)
+        results = rank_documents(doc_vectors, query_vec, query, top_n, mask, self.positional,
+                                 self.preprocess_positions, corrections, phrase_mode, proximity, phrase_boost,
+                                 candidates)
+        return SearchResults(results, corrections)
+
 
 if __name__ == '__main__':
     pipeline = Pipeline()
@@ -0,0 +1,160 @@
+import re
+import numpy as np
+
+
+# varint (7 bit per byte, bit ke-8 = lanjut) dari selisih posisi berurutan
+def encode_positions(positions):
+    out = bytearray()
+    previous = 0
+    for pos in positions:
+        delta = pos - previous
+        previous = pos
+        while delta >= 128:
+            out.append((delta & 127) | 128)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+# kebalikan encode_positions, tervektorisasi dengan NumPy
+def decode_positions(buf):
+    if len(buf) == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(buf < 128)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shift = 7 * (np.arange(len(buf)) - starts[group])
+    deltas = np.zeros(len(ends), dtype=np.int64)
+    np.add.at(deltas, group, (buf & 127).astype(np.int64) << shift)
+    return np.cumsum(deltas)
+
+
+# frasa dalam tanda kutip pada query: 'harga "bank indonesia"' -> ['bank indonesia']
+def parse_phrases(query):
+    return re.findall(r'"([^"]+)"', query)
+
+
+# Index posisional opsional: per term disimpan doc id (terurut) dan
+# posisi token per dokumen yang di-encode delta + varint dalam satu
+# array byte NumPy. Posisi dihitung dari token SEBELUM stopword removal,
+# jadi jarak antar kata sesuai teks asli.
+class PositionalIndex:
+    def __init__(self):
+        # term -> [list doc id, list bytes] selama build
+        self.pending = {}
+        # term -> (doc_ids int32, offsets int64, blob uint8) setelah dibekukan
+        self.postings = {}
+
+    def add_document(self, doc_id, stems, positions):
+        per_term = {}
+        for stem, pos in zip(stems, positions):
+            per_term.setdefault(stem, []).append(pos)
+        for stem, term_positions in per_term.items():
+            entry = self.pending.setdefault(stem, [[], []])
+            entry[0].append(doc_id)
+            entry[1].append(encode_positions(term_positions))
+
+    # gabungkan data pending ke array NumPy (dipanggil otomatis saat lookup)
+    def _freeze(self, term):
+        entry = self.pending.pop(term, None)
+        if entry is None:
+            return self.postings.get(term)
+
+        doc_ids, chunks = entry
+        lengths = np.array([len(c) for c in chunks], dtype=np.int64)
+        blob = np.frombuffer(b''.join(chunks), dtype=np.uint8)
+        if term in self.postings:
+            old_ids, old_offsets, old_blob = self.postings[term]
+            offsets = np.concatenate([old_offsets[:-1], old_offsets[-1] + np.concatenate(([0], np.cumsum(lengths)))])
+            doc_ids = np.concatenate([old_ids, np.array(doc_ids, dtype=np.int32)])
+            blob = np.concatenate([old_blob, blob])
+        else:
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            doc_ids = np.array(doc_ids, dtype=np.int32)
+        self.postings[term] = (doc_ids, offsets, blob)
+        return self.postings[term]
+
+    def freeze(self):
+        for term in list(self.pending):
+            self._freeze(term)
+
+    # posisi term untuk doc_ids kandidat saja; list posisi dokumen lain tidak di-decode
+    def positions(self, term, doc_ids):
+        posting = self._freeze(term)
+        if posting is None:
+            return {}
+        term_docs, offsets, blob = posting
+        idx = np.searchsorted(term_docs, doc_ids)
+        found = (idx < len(term_docs)) & (term_docs[np.minimum(idx, len(term_docs) - 1)] == doc_ids)
+        return {int(doc_ids[i]): decode_positions(blob[offsets[j]:offsets[j + 1]])
+                for i, j in zip(np.flatnonzero(found), idx[found])}
+
+    # terms/offsets: stem frasa beserta posisinya di query.
+    # window=None -> frasa persis (urutan & jarak sama dengan query),
+    # window=N   -> setiap term muncul dalam N kata dari term pertama.
+    # Mengembalikan boolean per doc_ids.
+    def match(self, doc_ids, terms, offsets, window=None):
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        matched = np.zeros(len(doc_ids), dtype=bool)
+        if not terms or len(doc_ids) == 0:
+            return matched
+
+        # term paling jarang dulu supaya kandidat cepat menyusut
+        def doc_count(term):
+            posting = self._freeze(term)
+            return 0 if posting is None else len(posting[0])
+        order = sorted(range(len(terms)), key=lambda i: doc_count(terms[i]))
+
+        candidates = np.sort(doc_ids)
+        per_term = {}
+        for i in order:
+            per_term[i] = self.positions(terms[i], candidates)
+            candidates = np.array(sorted(per_term[i]), dtype=np.int32)
+            if len(candidates) == 0:
+                return matched
+
+        hits = set()
+        for doc_id in candidates.tolist():
+            first = per_term[0][doc_id]
+            ok = np.ones(len(first), dtype=bool)
+            for i in range(1, len(terms)):
+                other = per_term[i][doc_id]
+                if window is None:
+                    ok &= np.isin(first + (offsets[i] - offsets[0]), other)
+                else:
+                    idx = np.searchsorted(other, first)
+                    left = np.abs(first - other[np.maximum(idx - 1, 0)])
+                    right = np.abs(other[np.minimum(idx, len(other) - 1)] - first)
+                    ok &= np.minimum(left, right) <= window
+            if ok.any():
+                hits.add(doc_id)
+
+        matched[:] = [int(d) in hits for d in doc_ids]
+        return matched
+
+    # salinan read-only untuk SearchIndex: hanya postings yang sudah dibekukan
+    def snapshot(self):
+        self.freeze()
+        frozen = PositionalIndex()
+        frozen.postings = dict(self.postings)
+        return frozen
+
+
+# kandidat hasil LSI [(doc_id, skor)] -> disaring (phrase_mode='filter') atau
+# diberi tambahan skor phrase_boost ('boost') jika cocok dengan semua frasa.
+# analyze(frasa) -> (stems, posisi) memakai preprocessing yang sama dengan index.
+def rerank_phrases(results, phrases, positional, analyze, proximity=None, phrase_mode='filter', phrase_boost=0.5):
+    doc_ids = [doc_id for doc_id, _ in results]
+    matched = np.ones(len(doc_ids), dtype=bool)
+    for phrase in phrases:
+        stems, positions = analyze(phrase)
+        # frasa yang seluruhnya stopword tidak membatasi apa pun
+        if not stems:
+            continue
+        matched &= positional.match(doc_ids, stems, positions, proximity)
+
+    if phrase_mode == 'boost':
+        results = [(doc_id, score + phrase_boost * bool(hit)) for (doc_id, score), hit in zip(results, matched)]
+        results.sort(key=lambda item: -item[1])
+        return results
+    return [item for item, hit in zip(results, matched) if hit]
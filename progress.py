@@ -0,0 +1,116 @@
+import time
+
+# Satuan yang ditampilkan per tahap
+STAGE_UNITS = {
+    'baca': 'file',
+    'preprocess': 'dok',
+    'lsi': 'chunk',
+    'ingest': 'file',
+    'cluster': 'batch',
+}
+
+
+# Pelacak progres + throughput untuk tahap ingest dan build model.
+# callback menerima dict snapshot (lihat snapshot()); tanpa callback,
+# baris throughput dicetak ke stdout setiap `interval` detik.
+class Progress:
+    def __init__(self, callback=None, interval=2.0):
+        self.callback = callback
+        self.interval = interval
+        self.stage = None
+        self.total = 0
+        self.done = 0
+        self.counters = {}
+        self.formats = {}
+        self.started = 0.0
+        self.last_report = 0.0
+        self.last_emitted = None
+
+    def start(self, stage, total):
+        self.stage = stage
+        self.total = total
+        self.done = 0
+        self.counters = {}
+        self.started = self.last_report = time.perf_counter()
+        self.last_emitted = None
+        # UI perlu tahu total sejak awal; CLI cukup baris throughput
+        if self.callback:
+            self._emit(force=True)
+
+    # n unit selesai, counters misalnya bytes=..., tokens=...
+    def advance(self, n=1, **counters):
+        self.done += n
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._emit()
+
+    # statistik per format file untuk mencari format yang lambat
+    def record_format(self, ext, seconds, nbytes):
+        stat = self.formats.setdefault(ext, {'files': 0, 'seconds': 0.0, 'bytes': 0})
+        stat['files'] += 1
+        stat['seconds'] += seconds
+        stat['bytes'] += nbytes
+
+    def finish(self):
+        # total bisa berubah di tengah jalan (mis. k-means konvergen lebih awal)
+        if self.last_emitted != (self.done, self.total):
+            self._emit(force=True)
+
+    def snapshot(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        rate = self.done / elapsed
+        remaining = max(self.total - self.done, 0)
+        return {
+            'stage': self.stage,
+            'done': self.done,
+            'total': self.total,
+            'elapsed': elapsed,
+            'rate': rate,
+            'eta': remaining / rate if rate > 0 else None,
+            'counters': {k: (v, v / elapsed) for k, v in self.counters.items()},
+            'formats': {k: dict(v) for k, v in self.formats.items()},
+        }
+
+    def _emit(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self.last_report < self.interval and self.done < self.total:
+            return
+        self.last_report = now
+        self.last_emitted = (self.done, self.total)
+        snap = self.snapshot()
+        if self.callback:
+            self.callback(snap)
+        else:
+            print(format_progress(snap))
+
+
+def format_size(nbytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if nbytes < 1024 or unit == 'GB':
+            return f"{nbytes:.1f}{unit}"
+        nbytes /= 1024
+
+
+def format_progress(snap):
+    unit = STAGE_UNITS.get(snap['stage'], 'item')
+    pct = 100.0 * snap['done'] / snap['total'] if snap['total'] else 100.0
+    line = f"[*] {snap['stage']} {snap['done']}/{snap['total']} ({pct:.1f}%) | {snap['rate']:.1f} {unit}/s"
+
+    for key, (value, rate) in snap['counters'].items():
+        if key == 'bytes':
+            line += f" | {format_size(value)} ({format_size(rate)}/s)"
+        else:
+            line += f" | {key} {value} ({rate:.0f}/s)"
+
+    if snap['eta'] is not None and snap['done'] < snap['total']:
+        minutes, seconds = divmod(int(snap['eta']), 60)
+        line += f" | ETA {minutes:02d}:{seconds:02d}"
+    return line
+
+
+def format_formats(snap):
+    lines = []
+    for ext, stat in sorted(snap['formats'].items()):
+        per_file = 1000 * stat['seconds'] / stat['files']
+        lines.append(f"    .{ext}: {stat['files']} file, {per_file:.1f} ms/file, {format_size(stat['bytes'])}")
+    return '\n'.join(lines)
@@ -0,0 +1,101 @@
+import numpy as np
+from positional import parse_phrases, rerank_phrases
+
+
+# Skor cosine + seleksi top-k dengan argpartition.
+# mask (boolean per dokumen) diterapkan SEBELUM skoring dan top-k, sehingga
+# hanya baris kandidat yang dihitung dan hasil tetap berjumlah top_n.
+def top_k(doc_vectors, query_vec, top_n=10, mask=None):
+    if mask is None:
+        candidates = None
+        sims = doc_vectors @ query_vec
+    else:
+        candidates = np.flatnonzero(mask)
+        sims = doc_vectors[candidates] @ query_vec
+
+    top_n = min(top_n, len(sims))
+    if top_n <= 0:
+        return []
+    top = np.argpartition(-sims, top_n - 1)[:top_n]
+    top = top[np.argsort(-sims[top])]
+    doc_ids = top if candidates is None else candidates[top]
+    return [(int(doc_id), float(score)) for doc_id, score in zip(doc_ids, sims[top])]
+
+
+# Proyeksi query ke ruang LSI lewat tabel fold-in (baris U dikali idf):
+# vektor = sum(tf * tabel[term]) / ||tf * idf||, setara dengan
+# lsi_model[tfidf_model[doc2bow(stems)]] tanpa transformasi gensim.
+# Mengembalikan None jika tidak ada term yang dikenal.
+def project_query(query_stems, token2id, idf, fold_in):
+    counts = {}
+    for stem in query_stems:
+        term_id = token2id.get(stem)
+        if term_id is not None and term_id < len(fold_in):
+            counts[term_id] = counts.get(term_id, 0) + 1
+    if not counts:
+        return None
+
+    ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=fold_in.dtype, count=len(counts))
+    norm = np.linalg.norm(tf * idf[ids])
+    if norm == 0:
+        return None
+    return (tf @ fold_in[ids]) / norm
+
+
+# Langkah query yang sama untuk Pipeline, SearchRuntime dan SearchIndex;
+# masing-masing hanya menyediakan array / objeknya sendiri.
+
+# stems query -> (vektor LSI ternormalisasi atau None, koreksi ejaan)
+# correct=True: stem yang tidak ada di token2id dikoreksi lewat spell (SpellIndex)
+def normalized_query(query_stems, token2id, idf, fold_in, spell=None, correct=True, dtype=None):
+    corrections = {}
+    if correct and spell is not None:
+        query_stems, corrections = spell.correct_stems(query_stems, token2id.__contains__)
+    query_vec = project_query(query_stems, token2id, idf, fold_in)
+    norm = np.linalg.norm(query_vec) if query_vec is not None else 0
+    if norm == 0:
+        return None, corrections
+    query_vec = query_vec / norm
+    return (query_vec.astype(dtype) if dtype is not None else query_vec), corrections
+
+
+# mask filter metadata, digabung dengan dokumen yang sudah dihapus dan
+# (route=N + query_vec) dokumen di N klaster terdekat; None = semua dokumen
+def combined_mask(metadata, deleted, filters=None, clusters=None, query_vec=None, route=None):
+    mask = metadata.mask(filters) if metadata is not None else None
+    if deleted is not None and deleted.any():
+        mask = ~deleted if mask is None else mask & ~deleted
+    if route and clusters is not None and query_vec is not None:
+        routed = clusters.route_mask(query_vec, route)
+        mask = routed if mask is None else mask & routed
+    return mask
+
+
+# top-k LSI; frasa dalam tanda kutip dicocokkan dengan index posisional pada
+# `candidates` kandidat teratas (lihat positional.rerank_phrases).
+# preprocess_positions: teks frasa -> (stems, posisi), koreksi ejaan ikut diterapkan
+def rank_documents(doc_vectors, query_vec, query, top_n=10, mask=None, positional=None,
+                   preprocess_positions=None, corrections=None, phrase_mode='filter', proximity=None,
+                   phrase_boost=0.5, candidates=200):
+    phrases = parse_phrases(query)
+    if not phrases or positional is None:
+        return top_k(doc_vectors, query_vec, top_n, mask)
+
+    corrections = corrections or {}
+
+    def analyze(phrase):
+        stems, positions = preprocess_positions(phrase)
+        return [corrections.get(stem, stem) for stem in stems], positions
+
+    results = top_k(doc_vectors, query_vec, max(candidates, top_n), mask)
+    results = rerank_phrases(results, phrases, positional, analyze, proximity, phrase_mode, phrase_boost)
+    return results[:top_n]
+
+
+# Hasil pencarian: tetap list [(doc_id, skor)], ditambah info pendukung
+# seperti koreksi ejaan query ({kata_salah: koreksi}).
+class SearchResults(list):
+    def __init__(self, items=(), corrections=None):
+        super().__init__(items)
+        self.corrections = corrections or {}
@@ -0,0 +1,107 @@
+import threading
+import numpy as np
+from pipeline import Tokenizer
+from metadata import DocumentMetadata
+from clustering import DocumentClusters
+from ranking import normalized_query, combined_mask, rank_documents, SearchResults
+
+
+def _frozen(array):
+    view = np.asarray(array).view()
+    view.setflags(write=False)
+    return view
+
+
+# Snapshot index siap-cari yang tidak berubah setelah dibuat, aman dipakai
+# bersama oleh banyak thread tanpa lock. Perubahan index (build ulang, watch
+# mode, add/remove) tidak menyentuh snapshot lama: penulis membuat snapshot
+# baru (Pipeline.snapshot / SearchIndex.load) lalu cukup mengganti referensinya.
+# - array NumPy berupa view read-only; pemilik aslinya hanya pernah mengganti
+#   array (vstack/concatenate), tidak menulis di tempat
+# - PyStemmer tidak thread-safe, jadi dibuat satu per thread (threading.local)
+# - skoring doc_vectors @ query lewat BLAS melepas GIL, sehingga query
+#   di thread berbeda benar-benar berjalan paralel
+class SearchIndex:
+    def __init__(self, token2id, idf, fold_in, doc_vectors, file_names, snippets, metadata=None, deleted=None,
+                 spell=None, clusters=None, positional=None, stopwords=frozenset()):
+        self.tokenizer = Tokenizer()
+        # himpunan stopword milik Pipeline/SearchRuntime (frozenset), tidak dibaca ulang
+        self.stopwords = stopwords
+        self.token2id = dict(token2id)
+        self.idf = _frozen(idf)
+        self.fold_in = _frozen(fold_in)
+        self.doc_vectors = _frozen(doc_vectors)
+        self.file_names = tuple(file_names)
+        self.snippets = tuple(snippets)
+        self.metadata = metadata
+        self.deleted = _frozen(deleted) if deleted is not None and deleted.any() else None
+        self.spell = spell
+        self.clusters = clusters
+        self.positional = positional
+        self._local = threading.local()
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError("SearchIndex read-only; buat snapshot baru untuk perubahan index")
+        super().__setattr__(name, value)
+
+    def __len__(self):
+        return len(self.file_names)
+
+    # snapshot dari Pipeline yang sedang hidup (dipanggil oleh thread penulis);
+    # snippet dan stopword sudah disiapkan Pipeline, jadi hanya referensinya disalin
+    @classmethod
+    def from_pipeline(cls, ir):
+        engine = ir.engine
+        fold_in = engine.fold_in_table()
+        metadata = DocumentMetadata.from_arrays(ir.metadata.to_arrays())
+        clusters = DocumentClusters.from_arrays(ir.clusters.to_arrays()) if ir.clusters is not None else None
+        positional = ir.positional.snapshot() if ir.positional is not None else None
+        return cls(engine.dictionary.token2id, engine._idf, fold_in, engine.index.index, ir.file_names,
+                   ir.snippets, metadata, ir.deleted.copy(), ir.spell, clusters, positional,
+                   ir.stopword.daftar_stopword)
+
+    # snapshot dari ir_index.npz (tanpa gensim, lewat SearchRuntime)
+    @classmethod
+    def load(cls, filepath='ir_index.npz', stopword_path='data/tala-stopwords-indonesia.txt'):
+        from search_runtime import SearchRuntime
+        runtime = SearchRuntime(stopword_path)
+        if not runtime.load_index(filepath):
+            return None
+        return cls(runtime.token2id, runtime.idf, runtime.fold_in, runtime.doc_vectors, runtime.file_names,
+                   runtime.snippets, runtime.metadata, runtime.deleted, runtime.spell, runtime.clusters,
+                   stopwords=runtime.stopword.daftar_stopword)
+
+    def _stemmer(self):
+        stemmer = getattr(self._local, 'stemmer', None)
+        if stemmer is None:
+            import Stemmer
+            stemmer = self._local.stemmer = Stemmer.Stemmer('indonesian')
+        return stemmer
+
+    # sama dengan Pipeline.preprocess / preprocess_positions
+    def preprocess(self, teks):
+        tokens = [t for t in self.tokenizer.tokenize(teks) if t not in self.stopwords]
+        return self._stemmer().stemWords(tokens)
+
+    def preprocess_positions(self, teks):
+        pairs = [(pos, t) for pos, t in enumerate(self.tokenizer.tokenize(teks)) if t not in self.stopwords]
+        stems = self._stemmer().stemWords([t for _, t in pairs])
+        return stems, [pos for pos, _ in pairs]
+
+    def search_mask(self, filters=None, query_vec=None, route=None):
+        return combined_mask(self.metadata, self.deleted, filters, self.clusters, query_vec, route)
+
+    # parameter sama dengan Pipeline.search (tanpa details)
+    def search(self, query, top_n=10, filters=None, phrase_mode='filter', proximity=None, phrase_boost=0.5,
+               candidates=200, correct=True, route=None):
+        query_vec, corrections = normalized_query(self.preprocess(query), self.token2id, self.idf, self.fold_in,
+                                                  self.spell, correct, self.doc_vectors.dtype)
+        if query_vec is None:
+            return SearchResults([], corrections)
+        mask = self.search_mask(filters, query_vec, route)
+        results = rank_documents(self.doc_vectors, query_vec, query, top_n, mask, self.positional,
+                                 self.preprocess_positions, corrections, phrase_mode, proximity, phrase_boost,
+                                 candidates)
+        return SearchResults(results, corrections)
@@ -0,0 +1,133 @@
+import numpy as np
+from pipeline import Tokenizer, Stopword
+from corpus_stats import CorpusStats
+from metadata import DocumentMetadata
+from ranking import project_query, normalized_query, combined_mask, rank_documents, SearchResults
+from explain import explain_query, format_explanation
+from spelling import SpellIndex
+from clustering import DocumentClusters
+
+
+# Runtime khusus pencarian: hanya butuh NumPy + PyStemmer.
+# Index dibangun sekali oleh Pipeline.run() / Pipeline.export_index(),
+# lalu dimuat di sini tanpa gensim, pandas, python-docx maupun pypdf.
+class SearchRuntime:
+    def __init__(self, stopword_path='data/tala-stopwords-indonesia.txt'):
+        self.tokenizer = Tokenizer()
+        self.stopword = Stopword(stopword_path)
+
+        import Stemmer
+        self.stemmer = Stemmer.Stemmer('indonesian')
+
+        self.token2id = {}
+        self.idf = None
+        self.u = None
+        self.fold_in = None
+        self.singular_values = None
+        self.doc_vectors = None
+        self.file_names = []
+        self.snippets = []
+        self.stats = None
+        self.metadata = None
+        self.deleted = None
+        self.spell = None
+        self.clusters = None
+
+    # tokenizing, stopword removal dan stemming (sama dengan Pipeline.preprocess)
+    def preprocess(self, teks):
+        tokens = self.tokenizer.tokenize(teks)
+        clean_tokens = self.stopword.remove(tokens)
+        return self.stemmer.stemWords(clean_tokens)
+
+    # doc_vectors=False: matriks dokumen tidak dibaca (dipakai TieredIndex)
+    def load_index(self, filepath='ir_index.npz', doc_vectors=True):
+        print(f"Memuat index dari '{filepath}'...")
+        try:
+            with np.load(filepath) as data:
+                self.token2id = {word: i for i, word in enumerate(data['vocab'].tolist())}
+                self.idf = data['idf']
+                self.u = data['u']
+                self.fold_in = self.idf[:, None] * self.u
+                if 's' in data.files:
+                    self.singular_values = data['s']
+                if doc_vectors:
+                    self.doc_vectors = data['doc_vectors']
+                self.file_names = data['file_names'].tolist()
+                self.snippets = data['snippets'].tolist()
+                if 'stats_cf' in data.files:
+                    self.stats = CorpusStats.from_arrays(data)
+                if 'deleted' in data.files and data['deleted'].any():
+                    self.deleted = data['deleted']
+                if 'spell_keys' in data.files:
+                    self.spell = SpellIndex.from_arrays(data)
+                if 'meta_format_codes' in data.files:
+                    self.metadata = DocumentMetadata.from_arrays(data)
+                if 'cluster_centroids' in data.files:
+                    self.clusters = DocumentClusters.from_arrays(data)
+            print("Index berhasil dimuat!")
+            return True
+        except Exception as e:
+            print(f"Gagal memuat index: {e}")
+            return False
+
+    # query stems -> vektor LSI (setara lsi_model[tfidf_model[doc2bow(stems)]])
+    def project(self, query_stems):
+        query_vec = project_query(query_stems, self.token2id, self.idf, self.fold_in)
+        return query_vec if query_vec is not None else np.zeros(self.u.shape[1], dtype=np.float32)
+
+    # query -> (vektor LSI ternormalisasi atau None, koreksi ejaan)
+    def query_vector(self, query, correct=True):
+        return normalized_query(self.preprocess(query), self.token2id, self.idf, self.fold_in, self.spell, correct)
+
+    # mask filter metadata digabung dengan dokumen yang sudah dihapus
+    # route=N + query_vec: hanya dokumen di N klaster terdekat (lihat clustering.py)
+    def search_mask(self, filters=None, query_vec=None, route=None):
+        return combined_mask(self.metadata, self.deleted, filters, self.clusters, query_vec, route)
+
+    # anggota klaster: [(doc_id, kemiripan ke centroid)], paling representatif dulu
+    def browse(self, cluster_id, limit=None):
+        if self.clusters is None:
+            return []
+        return self.clusters.members(cluster_id, self.doc_rows,
+                                     None if self.deleted is None else ~self.deleted, limit)
+
+    # baris vektor dokumen untuk doc_ids
+    def doc_rows(self, doc_ids):
+        return self.doc_vectors[list(doc_ids)]
+
+    # penjelasan skor query untuk beberapa doc id hasil search (lihat explain.py)
+    def explain(self, query, doc_ids, correct=True):
+        query_stems = self.preprocess(query)
+        if correct and self.spell is not None:
+            query_stems, _ = self.spell.correct_stems(query_stems, lambda stem: stem in self.token2id)
+        return explain_query(query_stems, doc_ids, self.doc_rows(doc_ids), self.token2id, self.idf, self.u,
+                             self.singular_values)
+
+    # filters: {'kategori': 'Olahraga', 'format': 'pdf'}, diterapkan sebelum top-k
+    # correct=True: stem yang tidak dikenal dikoreksi (lihat results.corrections)
+    # route=N: skoring dibatasi ke N klaster terdekat
+    def search(self, query, top_n=10, filters=None, correct=True, route=None):
+        if self.doc_vectors is None:
+            print("Error: Index belum dimuat.")
+            return SearchResults()
+
+        query_vec, corrections = self.query_vector(query, correct)
+        if query_vec is None:
+            return SearchResults([], corrections)
+        mask = self.search_mask(filters, query_vec, route)
+        return SearchResults(rank_documents(self.doc_vectors, query_vec, query, top_n, mask), corrections)
+
+
+if __name__ == '__main__':
+    import sys
+    # python search_runtime.py [--explain] kata kunci...
+    explain = '--explain' in sys.argv[1:]
+    query = ' '.join(arg for arg in sys.argv[1:] if arg != '--explain')
+    runtime = SearchRuntime()
+    if runtime.load_index() and query:
+        results = runtime.search(query)
+        for doc_id, score in results:
+            print(f"{runtime.file_names[doc_id]} | Score: {score:.4f}")
+        if explain and results:
+            print(format_explanation(runtime.explain(query, [doc_id for doc_id, _ in results[:3]]),
+                                     runtime.file_names))
@@ -0,0 +1,142 @@
+import numpy as np
+
+
+# semua string hasil menghapus 0..max_distance karakter dari word
+def deletes(word, max_distance):
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for w in frontier:
+            if len(w) > 1:
+                for i in range(len(w)):
+                    next_frontier.add(w[:i] + w[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+# jarak Damerau-Levenshtein (optimal string alignment), berhenti lebih awal
+# dan mengembalikan max_distance + 1 jika sudah pasti melebihi batas
+def edit_distance(a, b, max_distance):
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+# Index koreksi ejaan gaya SymSpell (symmetric delete) atas vocabulary stem.
+# Dibangun sekali saat build model. Disimpan ringkas sebagai array terurut
+# `keys` (string hasil delete) + offsets/ids (CSR), dicari dengan searchsorted.
+class SpellIndex:
+    def __init__(self, words, freqs, keys, offsets, ids, max_distance=2, prefix_length=7):
+        self.words = words
+        self.freqs = freqs
+        self.keys = keys
+        self.offsets = offsets
+        self.ids = ids
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.word_list = words.tolist()
+        self.word2id = {word: i for i, word in enumerate(self.word_list)}
+        # salah ketik yang sama sering berulang; hasilnya di-cache
+        self.cache = {}
+        self.cache_size = 10000
+
+    # cache tidak ikut disimpan ke pickle model
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['cache'] = {}
+        return state
+
+    @classmethod
+    def build(cls, words, freqs, max_distance=2, prefix_length=7):
+        entries = {}
+        for term_id, word in enumerate(words):
+            for d in deletes(word[:prefix_length], max_distance):
+                entries.setdefault(d, []).append(term_id)
+        keys = sorted(entries)
+        lengths = np.array([len(entries[k]) for k in keys], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        ids = np.array([term_id for k in keys for term_id in entries[k]], dtype=np.int32)
+        return cls(np.array(words, dtype=str), np.asarray(freqs, dtype=np.int64),
+                   np.array(keys, dtype=str), offsets, ids, max_distance, prefix_length)
+
+    # kata dasar terdekat (jarak terkecil, lalu frekuensi terbesar) -> (kata, jarak) / (None, None)
+    def correct(self, word):
+        if word in self.word2id:
+            return word, 0
+        # tanpa lock, aman dipakai banyak thread: cache boleh dikosongkan
+        # thread lain di antara cek dan baca, jadi hasil disimpan di variabel lokal
+        result = self.cache.get(word)
+        if result is None:
+            result = self._lookup(word)
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[word] = result
+        return result
+
+    def _lookup(self, word):
+        max_distance = self.max_distance if len(word) > 4 else 1
+
+        # semua delete dicari sekaligus dengan satu searchsorted
+        probes = np.array(list(deletes(word[:self.prefix_length], max_distance)), dtype=self.keys.dtype)
+        idx = self.keys.searchsorted(probes)
+        idx = idx[self.keys[np.minimum(idx, len(self.keys) - 1)] == probes]
+        candidates = set()
+        for i in idx.tolist():
+            candidates.update(self.ids[self.offsets[i]:self.offsets[i + 1]].tolist())
+
+        best, best_key = None, None
+        for term_id in candidates:
+            distance = edit_distance(word, self.word_list[term_id], max_distance)
+            if distance > max_distance:
+                continue
+            key = (distance, -self.freqs[term_id])
+            if best_key is None or key < best_key:
+                best, best_key = term_id, key
+        if best is None:
+            return None, None
+        return self.word_list[best], best_key[0]
+
+    # stems query -> (stems terkoreksi, {salah: koreksi}); known(stem) -> bool
+    def correct_stems(self, stems, known):
+        corrected, corrections = [], {}
+        for stem in stems:
+            if known(stem):
+                corrected.append(stem)
+                continue
+            fixed, _ = self.correct(stem)
+            if fixed is None:
+                corrected.append(stem)
+            else:
+                corrected.append(fixed)
+                corrections[stem] = fixed
+        return corrected, corrections
+
+    def to_arrays(self, prefix='spell_'):
+        return {
+            prefix + 'words': self.words,
+            prefix + 'freqs': self.freqs,
+            prefix + 'keys': self.keys,
+            prefix + 'offsets': self.offsets,
+            prefix + 'ids': self.ids,
+            prefix + 'params': np.array([self.max_distance, self.prefix_length]),
+        }
+
+    @classmethod
+    def from_arrays(cls, data, prefix='spell_'):
+        max_distance, prefix_length = data[prefix + 'params'].tolist()
+        return cls(data[prefix + 'words'], data[prefix + 'freqs'], data[prefix + 'keys'],
+                   data[prefix + 'offsets'], data[prefix + 'ids'], max_distance, prefix_length)
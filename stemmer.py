@@ -1,5 +1,10 @@
+import threading
 
-class Stemmer():
+
+# Subclass threading.local: word/flags/num_syllables adalah state per panggilan
+# stem(), jadi setiap thread mendapat salinan atribut sendiri dan satu objek
+# Stemmer aman dipakai bersama oleh banyak thread.
+class Stemmer(threading.local):
     
     # Constants untuk Flags 
     REMOVED_KE = 'removed_ke'
@@ -0,0 +1,389 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from search_runtime import SearchRuntime
+from pipeline import make_snippet
+from metadata import FIELDS
+from ranking import top_k, project_query, SearchResults
+from rwlock import RWLock
+
+
+# Index bertingkat di atas SearchRuntime:
+# - hot tier: dokumen terbaru, di memori, bisa ditambah kapan saja
+# - cold tier: arsip besar, file .npy yang di-memory-map, ditulis ulang jarang
+# Kedua tier memakai proyeksi LSI yang sama (tabel fold-in dari ir_index.npz),
+# sehingga skor cosine keduanya sebanding dan bisa langsung digabung.
+# Migrasi menyalin seluruh arsip cold ke generasi baru, jadi dibuat jarang
+# (histeresis): hanya jika hot melewati hot_max_docs (lalu dipangkas sampai
+# hot_low_docs), atau dokumen yang melewati hot_max_age sudah >= migrate_min_batch.
+class TieredIndex(SearchRuntime):
+    def __init__(self, tier_dir='ir_tiers', hot_max_age=7 * 24 * 3600, hot_max_docs=5000,
+                 migrate_interval=60.0, stopword_path='data/tala-stopwords-indonesia.txt',
+                 hot_low_docs=None, migrate_min_batch=1000):
+        super().__init__(stopword_path)
+        self.tier_dir = tier_dir
+        self.hot_max_age = hot_max_age
+        self.hot_max_docs = hot_max_docs
+        self.hot_low_docs = hot_max_docs // 2 if hot_low_docs is None else hot_low_docs
+        self.migrate_min_batch = migrate_min_batch
+        self.migrate_interval = migrate_interval
+
+        self.file_mtimes = np.zeros(0)
+        self.hot_ids = np.zeros(0, dtype=np.int64)
+        self.hot_vectors = None
+        self.cold_ids = np.zeros(0, dtype=np.int64)
+        self.cold_vectors = None
+        self.cold_generation = 0
+        self.base_signature = None
+        self.num_base = 0
+
+        self.lock = RWLock()
+        # penulis catalog (add_documents, migrasi latar) tidak boleh saling timpa
+        self.save_lock = threading.Lock()
+        self.reader = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _path(self, name):
+        return os.path.join(self.tier_dir, name)
+
+    # doc_vectors hanya dibaca jika tier harus dibangun ulang; dengan catalog
+    # yang valid startup tidak pernah memuat matriks penuh ke RAM
+    def load_index(self, filepath='ir_index.npz'):
+        if not super().load_index(filepath, doc_vectors=False):
+            return False
+        num_docs = self.num_base = len(self.file_names)
+        with np.load(filepath) as data:
+            mtimes = data['file_mtimes'] if 'file_mtimes' in data.files else np.zeros(0)
+        # model lama tanpa mtime: semua dianggap arsip (cold)
+        self.file_mtimes = mtimes if len(mtimes) == num_docs else np.zeros(num_docs)
+        self.base_signature = np.array([os.path.getmtime(filepath), num_docs])
+
+        os.makedirs(self.tier_dir, exist_ok=True)
+        if not self._load_catalog():
+            print("[*] Membagi dokumen ke hot/cold tier...")
+            with np.load(filepath) as data:
+                doc_vectors = data['doc_vectors']
+            doc_ids = np.arange(num_docs)
+            is_hot = self.file_mtimes >= time.time() - self.hot_max_age
+            self.hot_ids, self.hot_vectors = doc_ids[is_hot], doc_vectors[is_hot]
+            old_generation = self._swap_cold(*self._write_cold(doc_ids[~is_hot], [doc_vectors[~is_hot]]))
+            del doc_vectors
+            self.save()
+            self._remove_generation(old_generation)
+
+        print(f"[*] Tier siap: hot {len(self.hot_ids)} dokumen, cold {len(self.cold_ids)} dokumen (mmap).")
+        return True
+
+    # Data dokumen dasar (id < num_base) selalu dari ir_index.npz. Dokumen yang
+    # ditambahkan sesudahnya disimpan bersama tier tempatnya berada:
+    # - catalog.npz: hot tier (ids, vektor, data dokumen tambahan di hot), kecil
+    #   dan ditulis ulang setiap add_documents
+    # - cold_docs_<generasi>.npz: data dokumen tambahan di cold, ditulis sekali
+    #   bersama cold_ids/cold_vectors generasi tersebut
+    # Semuanya valid hanya untuk ir_index.npz yang sama (base_signature).
+    def _load_catalog(self):
+        path = self._path('catalog.npz')
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as data:
+                # dibaca lebih dulu: build ulang melanjutkan penomoran generasi
+                # dan membuang file generasi lama
+                self.cold_generation = int(data['cold_generation'])
+                if not np.array_equal(data['base_signature'], self.base_signature):
+                    print("[*] Index dasar berubah, tier dibangun ulang.")
+                    return False
+                hot_ids, hot_vectors = data['hot_ids'], data['hot_vectors']
+                hot_docs = {key: data[key] for key in data.files if key.startswith('doc_')}
+            with np.load(self._path(f'cold_docs_{self.cold_generation}.npz')) as data:
+                cold_docs = {key: data[key] for key in data.files}
+            cold_ids = np.load(self._path(f'cold_ids_{self.cold_generation}.npy'))
+            cold_vectors = np.load(self._path(f'cold_vectors_{self.cold_generation}.npy'), mmap_mode='r')
+            self._restore_docs([hot_docs, cold_docs])
+        except Exception as e:
+            print(f"Gagal memuat tier: {e}")
+            return False
+        self.hot_ids, self.hot_vectors = hot_ids, hot_vectors
+        self.cold_ids, self.cold_vectors = cold_ids, cold_vectors
+        return True
+
+    # data dokumen tambahan (id >= num_base) di antara doc_ids -> array untuk disimpan
+    def _doc_arrays(self, doc_ids):
+        ids = np.sort(doc_ids[doc_ids >= self.num_base])
+        arrays = {
+            'doc_ids': ids,
+            'doc_file_names': np.array([self.file_names[i] for i in ids], dtype=str),
+            'doc_snippets': np.array([self.snippets[i] for i in ids], dtype=str),
+            'doc_file_mtimes': self.file_mtimes[ids],
+        }
+        if self.metadata is not None:
+            for field in FIELDS:
+                values = np.array(self.metadata.values[field], dtype=str)
+                arrays[f'doc_meta_{field}'] = values[self.metadata.codes[field][ids]]
+        if self.clusters is not None:
+            arrays['doc_clusters'] = self.clusters.assignments[ids]
+        return arrays
+
+    # kebalikan _doc_arrays: dokumen tambahan dari beberapa bagian (hot + cold)
+    # disambung ke data dokumen dasar, urut doc id
+    def _restore_docs(self, parts):
+        parts = [part for part in parts if len(part.get('doc_ids', ()))]
+        if not parts:
+            return
+        ids = np.concatenate([part['doc_ids'] for part in parts])
+        order = np.argsort(ids)
+        if not np.array_equal(ids[order], np.arange(self.num_base, self.num_base + len(ids))):
+            raise ValueError("data dokumen tambahan tidak lengkap")
+
+        def column(key):
+            return np.concatenate([part[key] for part in parts])[order]
+
+        self.file_names.extend(column('doc_file_names').tolist())
+        self.snippets.extend(column('doc_snippets').tolist())
+        self.file_mtimes = np.concatenate([self.file_mtimes, column('doc_file_mtimes')])
+        if self.deleted is not None:
+            self.deleted = np.concatenate([self.deleted, np.zeros(len(ids), dtype=bool)])
+        if self.metadata is not None:
+            values = {field: column(f'doc_meta_{field}').tolist() for field in FIELDS}
+            self.metadata.add([{field: values[field][i] for field in FIELDS} for i in range(len(ids))])
+        if self.clusters is not None:
+            self.clusters.assignments = np.concatenate([self.clusters.assignments,
+                                                        column('doc_clusters').astype(np.int32)])
+
+    # hanya hot tier yang ditulis (ukurannya dibatasi hot_max_docs); ke file
+    # sementara unik lalu os.replace, di bawah save_lock sehingga penyimpanan
+    # dari beberapa thread tidak saling menimpa
+    def save(self):
+        with self.save_lock:
+            self._save()
+
+    def _save(self):
+        with self.lock.read():
+            arrays = {
+                'base_signature': self.base_signature,
+                'hot_ids': self.hot_ids,
+                'hot_vectors': self.hot_vectors,
+                'cold_generation': np.array(self.cold_generation),
+            }
+            arrays.update(self._doc_arrays(self.hot_ids))
+        fd, tmp = tempfile.mkstemp(prefix='catalog.', suffix='.tmp', dir=self.tier_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self._path('catalog.npz'))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    # menulis generasi cold baru; parts disalin per bagian (cold lama bisa berupa mmap)
+    def _write_cold(self, doc_ids, parts):
+        generation = self.cold_generation + 1
+        num_topics = self.u.shape[1]
+        total = sum(len(p) for p in parts)
+        vectors = np.lib.format.open_memmap(self._path(f'cold_vectors_{generation}.npy'), mode='w+',
+                                            dtype=np.float32, shape=(total, num_topics))
+        start = 0
+        for part in parts:
+            for chunk_start in range(0, len(part), 65536):
+                chunk = part[chunk_start:chunk_start + 65536]
+                vectors[start:start + len(chunk)] = chunk
+                start += len(chunk)
+        vectors.flush()
+        del vectors
+        np.save(self._path(f'cold_ids_{generation}.npy'), doc_ids)
+        with self.lock.read():
+            docs = self._doc_arrays(doc_ids)
+        np.savez(self._path(f'cold_docs_{generation}.npz'), **docs)
+        return generation, doc_ids
+
+    # cold baru dan hot yang dipangkas (moved_ids) diganti dalam satu write lock,
+    # jadi query tidak pernah melihat dokumen yang sama di kedua tier.
+    # Generasi lama dikembalikan; filenya baru dihapus setelah catalog baru tersimpan.
+    def _swap_cold(self, generation, doc_ids, moved_ids=None):
+        vectors = np.load(self._path(f'cold_vectors_{generation}.npy'), mmap_mode='r')
+        with self.lock.write():
+            old_generation = self.cold_generation
+            self.cold_ids, self.cold_vectors, self.cold_generation = doc_ids, vectors, generation
+            if moved_ids is not None:
+                keep = ~np.isin(self.hot_ids, moved_ids)
+                self.hot_ids, self.hot_vectors = self.hot_ids[keep], self.hot_vectors[keep]
+        return old_generation
+
+    def _remove_generation(self, generation):
+        for name in (f'cold_vectors_{generation}.npy', f'cold_ids_{generation}.npy',
+                     f'cold_docs_{generation}.npz'):
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    # baris vektor dokumen dicari di tier tempat dokumen itu berada
+    def doc_rows(self, doc_ids):
+        rows = np.zeros((len(doc_ids), self.u.shape[1]), dtype=np.float32)
+        with self.lock.read():
+            for i, doc_id in enumerate(doc_ids):
+                for tier_ids, vectors in ((self.hot_ids, self.hot_vectors), (self.cold_ids, self.cold_vectors)):
+                    found = np.flatnonzero(tier_ids == doc_id)
+                    if len(found):
+                        rows[i] = vectors[found[0]]
+                        break
+        return rows
+
+    # fan-out ke kedua tier lalu gabungkan top-k
+    def search(self, query, top_n=10, filters=None, correct=True, route=None):
+        query_vec, corrections = self.query_vector(query, correct)
+        if query_vec is None:
+            return SearchResults([], corrections)
+
+        results = []
+        with self.lock.read():
+            mask = self.search_mask(filters, query_vec, route)
+            for doc_ids, vectors in ((self.hot_ids, self.hot_vectors), (self.cold_ids, self.cold_vectors)):
+                if len(doc_ids) == 0:
+                    continue
+                tier_mask = None if mask is None else mask[doc_ids]
+                for local_id, score in top_k(vectors, query_vec, top_n, tier_mask):
+                    results.append((int(doc_ids[local_id]), score))
+        results.sort(key=lambda item: -item[1])
+        return SearchResults(results[:top_n], corrections)
+
+    # dokumen baru selalu masuk hot tier
+    def add_documents(self, file_paths):
+        if self.reader is None:
+            from pipeline import Pipeline
+            self.reader = Pipeline()
+        prepared = self.reader.prepare_documents(file_paths)
+        if not prepared:
+            return 0
+
+        vectors = np.zeros((len(prepared), self.u.shape[1]), dtype=np.float32)
+        for i, doc in enumerate(prepared):
+            vec = project_query(doc['stems'], self.token2id, self.idf, self.fold_in)
+            if vec is not None and np.linalg.norm(vec) > 0:
+                vectors[i] = vec / np.linalg.norm(vec)
+
+        with self.lock.write():
+            first_id = len(self.file_names)
+            new_ids = np.arange(first_id, first_id + len(prepared))
+            self.hot_ids = np.concatenate([self.hot_ids, new_ids])
+            self.hot_vectors = np.vstack([self.hot_vectors, vectors])
+            self.file_names.extend(doc['name'] for doc in prepared)
+            self.snippets.extend(make_snippet(doc['content']) for doc in prepared)
+            self.file_mtimes = np.concatenate([self.file_mtimes, [doc['mtime'] for doc in prepared]])
+            if self.deleted is not None:
+                self.deleted = np.concatenate([self.deleted, np.zeros(len(prepared), dtype=bool)])
+            if self.metadata is not None:
+                self.metadata.add([doc['record'] for doc in prepared])
+            if self.clusters is not None:
+                self.clusters.add(vectors)
+        # hanya hot tier yang ditulis ulang (lihat _load_catalog)
+        self.save()
+        return len(prepared)
+
+    # pindahkan dokumen hot ke cold tier, dengan histeresis (lihat docstring kelas)
+    def migrate(self):
+        with self.lock.read():
+            hot_ids, hot_vectors = self.hot_ids, self.hot_vectors
+            cold_ids, cold_vectors = self.cold_ids, self.cold_vectors
+            mtimes = self.file_mtimes
+
+        aged = mtimes[hot_ids] < time.time() - self.hot_max_age
+        if len(hot_ids) > self.hot_max_docs:
+            # high-water terlewati: yang kedaluwarsa, lalu yang paling lama
+            # di antara sisanya, sampai hot tinggal hot_low_docs
+            move = aged.copy()
+            excess = len(hot_ids) - move.sum() - self.hot_low_docs
+            if excess > 0:
+                remaining = np.flatnonzero(~move)
+                oldest = remaining[np.argsort(mtimes[hot_ids[remaining]])[:excess]]
+                move[oldest] = True
+        elif aged.sum() >= self.migrate_min_batch:
+            move = aged
+        else:
+            return 0
+        if not move.any():
+            return 0
+
+        # cold baru ditulis di luar lock; query tetap jalan memakai generasi lama
+        moved_ids = hot_ids[move]
+        generation, new_cold_ids = self._write_cold(np.concatenate([cold_ids, moved_ids]),
+                                                    [cold_vectors, hot_vectors[move]])
+        old_generation = self._swap_cold(generation, new_cold_ids, moved_ids)
+        self.save()
+        self._remove_generation(old_generation)
+        print(f"[*] Migrasi: {len(moved_ids)} dokumen hot -> cold (cold: {len(new_cold_ids)}).")
+        return len(moved_ids)
+
+    def start_migration(self):
+        def loop():
+            while not self.stop_event.wait(self.migrate_interval):
+                try:
+                    self.migrate()
+                except Exception as e:
+                    print(f"Gagal migrasi tier: {e}")
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+def print_results(index, results):
+    for doc_id, score in results:
+        print(f"{index.file_names[doc_id]} | Score: {score:.4f}")
+
+
+# Mode layanan: index tetap hidup, migrasi hot -> cold berjalan di latar
+# (start_migration). Tiap baris stdin adalah query; baris "+ path [path ...]"
+# menambahkan dokumen ke hot tier.
+def serve(index):
+    index.start_migration()
+    print(f"[*] Mode layanan: migrasi latar tiap {index.migrate_interval:.0f}s. "
+          "Ketik query, '+ path' untuk menambah dokumen, Ctrl+D untuk berhenti.")
+    try:
+        for line in sys.stdin:
+            line = line.strip()
+            if line.startswith('+'):
+                added = index.add_documents(line[1:].split())
+                print(f"[*] {added} dokumen ditambahkan (hot: {len(index.hot_ids)}).")
+            elif line:
+                print_results(index, index.search(line))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        index.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Pencarian dengan index bertingkat hot/cold")
+    parser.add_argument('query', nargs='*')
+    parser.add_argument('--index', default='ir_index.npz')
+    parser.add_argument('--tier-dir', default='ir_tiers')
+    parser.add_argument('--hot-max-age', type=float, default=7 * 24 * 3600, help="detik")
+    parser.add_argument('--hot-max-docs', type=int, default=5000, help="high-water hot tier")
+    parser.add_argument('--hot-low-docs', type=int, default=None, help="low-water setelah migrasi (default: separuh)")
+    parser.add_argument('--migrate-min-batch', type=int, default=1000,
+                        help="minimum dokumen kedaluwarsa sebelum migrasi karena umur")
+    parser.add_argument('--migrate', action='store_true', help="jalankan migrasi hot -> cold sekali")
+    parser.add_argument('--serve', action='store_true', help="mode layanan dengan migrasi latar (query dari stdin)")
+    parser.add_argument('--migrate-interval', type=float, default=60.0, help="detik antar cek migrasi (--serve)")
+    args = parser.parse_args()
+
+    index = TieredIndex(args.tier_dir, args.hot_max_age, args.hot_max_docs, args.migrate_interval,
+                        hot_low_docs=args.hot_low_docs, migrate_min_batch=args.migrate_min_batch)
+    if index.load_index(args.index):
+        if args.migrate:
+            index.migrate()
+        if args.query:
+            print_results(index, index.search(' '.join(args.query)))
+        if args.serve:
+            serve(index)
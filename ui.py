@@ -2,21 +2,24 @@ import sys
 import os
 import platform
 import subprocess
-from collections import Counter
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLineEdit, QPushButton, QLabel, 
                              QTextBrowser, QProgressBar, QMessageBox, QFileDialog,
                              QStackedWidget, QListWidget, QTableWidget, 
-                             QTableWidgetItem, QHeaderView)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+                             QTableWidgetItem, QHeaderView, QComboBox)
+from PyQt5.QtCore import Qt, QThread, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor
 from pipeline import Pipeline
+from progress import Progress, format_progress
 
 
 # --- WORKER THREAD (Agar UI tidak macet saat proses berat) ---
 class Worker(QThread):
     status = pyqtSignal(str)
+    progress = pyqtSignal(dict)
     result_stats = pyqtSignal(list)
-    result_search = pyqtSignal(list)
+    # snapshot SearchIndex baru untuk thread pencarian
+    index_ready = pyqtSignal(object)
 
     def __init__(self, ir, task, **kwargs):
         super().__init__()
@@ -30,37 +33,103 @@ class Worker(QThread):
             folder = self.data['folder']
             try:
                 self.status.emit("Membangun Index LSI...")
-                self.ir.read_directory(folder)
-                self.ir.save_model()
-
-                self.status.emit("Menghitung Statistik Kata...")
-                all_stems = []
-                for c in self.ir.raw_contents:
-                    stems = self.ir.preprocess(c)
-                    all_stems.extend(stems)
-                
-                # Ambil 500 kata terbanyak
-                stats = Counter(all_stems).most_common(500)
+                self.ir.run(folder, progress=Progress(callback=self.progress.emit, interval=0.2), positional=True)
+                self.index_ready.emit(self.ir.snapshot())
+
+                # Ambil 500 kata terbanyak dari statistik yang dihitung saat build
+                stats = self.ir.top_terms(500)
                 self.result_stats.emit(stats)
             except Exception as e:
                 self.status.emit(f"Error: {e}")
 
-        # -- Logika Searching --
-        elif self.task == 'search':
-            query = self.data['query']
-            if not self.ir.engine: return
-            
-            q_stems = self.ir.preprocess(query)
-            results = self.ir.engine.display_lsi_details(q_stems)
-            
-            output = []
-            for doc_id, score in results:
-                fname = self.ir.file_names[doc_id]
-                raw = self.ir.raw_contents[doc_id]
-                snippet = raw[:200].replace('\n', ' ') + "..."
-                output.append((fname, score, snippet))
-            
-            self.result_search.emit(output)
+
+# --- SEARCH EXECUTOR (thread pool + pembatalan query lama + debounce) ---
+class SearchSignals(QObject):
+    # (generation, baris hasil[, koreksi ejaan])
+    first_page = pyqtSignal(int, list, dict)
+    rest = pyqtSignal(int, list)
+
+
+class SearchTask(QRunnable):
+    def __init__(self, executor, index, generation, query, filters):
+        super().__init__()
+        self.executor = executor
+        # snapshot dipegang sampai task selesai, walau index baru sudah dipublikasikan
+        self.index = index
+        self.generation = generation
+        self.query = query
+        self.filters = filters
+
+    def rows(self, results):
+        output = []
+        for doc_id, score in results:
+            fname = self.index.file_names[doc_id]
+            snippet = self.index.snippets[doc_id] + "..."
+            output.append((fname, score, snippet))
+        return output
+
+    def run(self):
+        ex = self.executor
+        if ex.is_stale(self.generation): return
+
+        # Skoring sekali untuk semua hasil; halaman pertama dirender lebih dulu,
+        # sisanya (yang perlu membangun baris + snippet) menyusul
+        results = self.index.search(self.query, top_n=ex.max_results, filters=self.filters)
+        if ex.is_stale(self.generation): return
+        ex.signals.first_page.emit(self.generation, self.rows(results[:ex.page_size]), results.corrections)
+
+        if len(results) <= ex.page_size: return
+        rest = self.rows(results[ex.page_size:])
+        if ex.is_stale(self.generation): return
+        ex.signals.rest.emit(self.generation, rest)
+
+
+class SearchExecutor(QObject):
+    def __init__(self, page_size=20, max_results=500, debounce_ms=300):
+        super().__init__()
+        self.index = None
+        self.page_size = page_size
+        self.max_results = max_results
+        self.signals = SearchSignals()
+        self.generation = 0
+        self.pending_query = ""
+        self.pending_filters = None
+
+        # Query dijalankan pada SearchIndex (read-only) sehingga boleh paralel;
+        # query yang sudah basi dibuang dari antrian.
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max(QThread.idealThreadCount(), 1))
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._start)
+
+    # dipanggil setelah build: query berikutnya memakai snapshot baru
+    def publish(self, index):
+        self.index = index
+
+    def is_stale(self, generation):
+        return generation != self.generation
+
+    # search-as-you-type: tunggu user berhenti mengetik
+    def submit(self, query, filters=None, debounce=True):
+        self.pending_query = query
+        self.pending_filters = filters
+        self.cancel()
+        if debounce:
+            self.timer.start()
+        else:
+            self._start()
+
+    def cancel(self):
+        self.timer.stop()
+        self.generation += 1
+        self.pool.clear()
+
+    def _start(self):
+        if self.index is None or not self.pending_query: return
+        self.pool.start(SearchTask(self, self.index, self.generation, self.pending_query, self.pending_filters))
 
 # --- CLASS GUI UTAMA ---
 class GUI(QMainWindow):
@@ -68,6 +137,11 @@ class GUI(QMainWindow):
         super().__init__()
         self.ir = Pipeline()
         self.folder_path = ""
+        self.search_executor = SearchExecutor()
+        self.search_executor.signals.first_page.connect(self.display_results)
+        self.search_executor.signals.rest.connect(self.store_more_results)
+        self.pending_rows = []
+        self.shown_count = 0
 
         self.setWindowTitle("Sistem IR - Wizard Mode")
         self.setGeometry(100, 100, 900, 650)
@@ -188,21 +262,32 @@ class GUI(QMainWindow):
         # Input Search
         h_search = QHBoxLayout()
         self.input_query = QLineEdit()
-        self.input_query.setPlaceholderText("Masukkan kata kunci...")
+        self.input_query.setPlaceholderText("Masukkan kata kunci... (gunakan \"tanda kutip\" untuk frasa)")
         self.input_query.setFixedHeight(40)
         self.input_query.returnPressed.connect(self.action_search)
+        self.input_query.textChanged.connect(self.action_search_typing)
         
         btn_cari = QPushButton("Cari")
         btn_cari.setFixedHeight(40)
         btn_cari.clicked.connect(self.action_search)
 
+        # Filter (diterapkan sebelum top-k di engine)
+        self.combo_kategori = QComboBox()
+        self.combo_format = QComboBox()
+        for combo in (self.combo_kategori, self.combo_format):
+            combo.setFixedHeight(40)
+            combo.currentIndexChanged.connect(lambda _: self.action_search())
+
         h_search.addWidget(self.input_query)
+        h_search.addWidget(self.combo_kategori)
+        h_search.addWidget(self.combo_format)
         h_search.addWidget(btn_cari)
 
         # Hasil
         self.browser = QTextBrowser()
         self.browser.setOpenExternalLinks(False)
         self.browser.anchorClicked.connect(self.action_open_file)
+        self.browser.verticalScrollBar().valueChanged.connect(self.action_scroll)
 
         # Tombol Reset
         btn_reset = QPushButton("<< Cari Folder Baru (Reset)")
@@ -243,14 +328,38 @@ class GUI(QMainWindow):
         self.btn_start_process.setEnabled(False)
         self.btn_next_2.setEnabled(False)
         self.pbar.setVisible(True)
-        self.pbar.setRange(0, 0) # Infinite loading
+        self.pbar.setRange(0, 0) # Infinite loading sampai laporan progres pertama
         
         # Jalankan Thread
         self.worker = Worker(self.ir, 'process', folder=self.folder_path)
         self.worker.status.connect(lambda s: self.lbl_process_status.setText(s))
+        self.worker.progress.connect(self.update_progress)
+        self.worker.index_ready.connect(self.search_executor.publish)
         self.worker.result_stats.connect(self.finish_process)
         self.worker.start()
 
+    def update_progress(self, snap):
+        self.pbar.setRange(0, max(snap['total'], 1))
+        self.pbar.setValue(snap['done'])
+        self.lbl_process_status.setText(format_progress(snap))
+
+    def fill_filters(self):
+        for combo, field, label in ((self.combo_kategori, 'kategori', "Semua Kategori"),
+                                    (self.combo_format, 'format', "Semua Format")):
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(label, None)
+            for value, count in sorted(self.ir.metadata.facet_counts(field).items()):
+                if value: combo.addItem(f"{value} ({count})", value)
+            combo.blockSignals(False)
+
+    def current_filters(self):
+        filters = {}
+        for combo, field in ((self.combo_kategori, 'kategori'), (self.combo_format, 'format')):
+            if combo.currentData():
+                filters[field] = combo.currentData()
+        return filters
+
     def finish_process(self, stats):
         self.pbar.setVisible(False)
         self.lbl_process_status.setText("Selesai. Data siap dicari.")
@@ -263,25 +372,27 @@ class GUI(QMainWindow):
             self.table_stats.setItem(row, 0, QTableWidgetItem(kata))
             self.table_stats.setItem(row, 1, QTableWidgetItem(str(jumlah)))
 
+        self.fill_filters()
+
     # --- Page 3 Logic ---
     def action_search(self):
         q = self.input_query.text().strip()
         if not q: return
         
         self.browser.setText("Mencari...")
-        
-        # Jalankan Thread Search
-        self.worker = Worker(self.ir, 'search', query=q)
-        self.worker.result_search.connect(self.display_results)
-        self.worker.start()
+        self.search_executor.submit(q, self.current_filters(), debounce=False)
 
-    def display_results(self, data):
-        if not data:
-            self.browser.setHtml("<h3>Tidak ditemukan.</h3>")
+    def action_search_typing(self, text):
+        q = text.strip()
+        if not q:
+            self.search_executor.cancel()
+            self.browser.clear()
             return
+        self.search_executor.submit(q, self.current_filters())
 
+    def render_rows(self, rows, start):
         html = ""
-        for i, (fname, score, snippet) in enumerate(data):
+        for i, (fname, score, snippet) in enumerate(rows, start):
             html += f"""
             <div style='margin-bottom:15px; border-bottom:1px solid #ccc;'>
                 <b>#{i+1}</b> <span style='color:green'>Score: {score:.4f}</span><br>
@@ -289,7 +400,39 @@ class GUI(QMainWindow):
                 <p style='color:#666;'>{snippet}</p>
             </div>
             """
-        self.browser.setHtml(html)
+        return html
+
+    def display_results(self, generation, data, corrections):
+        if self.search_executor.is_stale(generation): return
+        self.pending_rows = []
+        self.shown_count = len(data)
+
+        html = ""
+        if corrections:
+            fixed = ', '.join(f"<s>{k}</s> → <b>{v}</b>" for k, v in corrections.items())
+            html += f"<p style='color:#a60;'>Koreksi ejaan: {fixed}</p>"
+        if not data:
+            self.browser.setHtml(html + "<h3>Tidak ditemukan.</h3>")
+            return
+        self.browser.setHtml(html + self.render_rows(data, 0))
+
+    def store_more_results(self, generation, data):
+        if self.search_executor.is_stale(generation): return
+        self.pending_rows = data
+        # Jika halaman pertama belum memenuhi layar, langsung tambah
+        self.action_scroll(self.browser.verticalScrollBar().value())
+
+    # Muat halaman berikutnya saat scroll mendekati bawah
+    def action_scroll(self, value):
+        bar = self.browser.verticalScrollBar()
+        if not self.pending_rows or value < bar.maximum() - bar.pageStep() // 2: return
+
+        page_size = self.search_executor.page_size
+        page, self.pending_rows = self.pending_rows[:page_size], self.pending_rows[page_size:]
+        cursor = self.browser.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertHtml(self.render_rows(page, self.shown_count))
+        self.shown_count += len(page)
 
     def action_open_file(self, url):
         # Fungsi buka file standard
@@ -313,6 +456,8 @@ class GUI(QMainWindow):
         self.stack.setCurrentIndex(0)
         self.list_files.clear()
         self.table_stats.setRowCount(0)
+        self.search_executor.cancel()
+        self.pending_rows = []
         self.browser.clear()
         self.input_query.clear()
         self.btn_next_1.setEnabled(False)
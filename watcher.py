@@ -0,0 +1,272 @@
+import argparse
+import os
+import threading
+import time
+import numpy as np
+from pipeline import Pipeline
+from metadata import METADATA_FILE, DocumentMetadata, load_metadata_file, inherit_metadata
+
+EXTENSIONS = ('.txt', '.docx', '.pdf')
+
+
+def is_document(path):
+    name = os.path.basename(path)
+    return name.endswith(EXTENSIONS) and not name.startswith('~')
+
+
+# snapshot {path: mtime} seluruh dokumen di folder
+def scan_folder(folder_path):
+    snapshot = {}
+    for root, _, files in os.walk(folder_path):
+        for file in files:
+            path = os.path.join(root, file)
+            if is_document(path):
+                try:
+                    snapshot[path] = os.path.getmtime(path)
+                except OSError:
+                    pass
+    return snapshot
+
+
+# Sumber event fallback: bandingkan mtime tiap `interval` detik
+class PollingSource:
+    def __init__(self, folder_path, known, interval=2.0):
+        self.folder_path = folder_path
+        self.snapshot = dict(known)
+        self.interval = interval
+
+    # -> list (path, 'changed'|'deleted')
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = scan_folder(self.folder_path)
+        events = [(path, 'changed') for path, mtime in current.items() if self.snapshot.get(path) != mtime]
+        events += [(path, 'deleted') for path in self.snapshot if path not in current]
+        self.snapshot = current
+        return events
+
+
+# Sumber event inotify (Linux, butuh paket inotify_simple)
+class InotifySource:
+    def __init__(self, folder_path):
+        from inotify_simple import INotify, flags
+        self.flags = flags
+        self.inotify = INotify()
+        self.mask = (flags.CLOSE_WRITE | flags.MOVED_TO | flags.DELETE | flags.MOVED_FROM | flags.CREATE)
+        self.dirs = {}
+        for root, _, _ in os.walk(folder_path):
+            self._watch(root)
+
+    def _watch(self, path):
+        self.dirs[self.inotify.add_watch(path, self.mask)] = path
+
+    def poll(self, timeout):
+        events = []
+        for event in self.inotify.read(timeout=int(timeout * 1000)):
+            path = os.path.join(self.dirs.get(event.wd, ''), event.name)
+            if event.mask & self.flags.ISDIR:
+                if event.mask & self.flags.CREATE:
+                    self._watch(path)
+                continue
+            if not is_document(path):
+                continue
+            if event.mask & (self.flags.DELETE | self.flags.MOVED_FROM):
+                events.append((path, 'deleted'))
+            elif event.mask & (self.flags.CLOSE_WRITE | self.flags.MOVED_TO):
+                events.append((path, 'changed'))
+        return events
+
+
+# Watch mode: event file dikumpulkan (debounce) menjadi micro-batch,
+# hanya file yang berubah diekstrak ulang lalu dimasukkan ke index live.
+# Query lewat search() dilayani dari SearchIndex (snapshot read-only) yang
+# diterbitkan ulang setelah tiap batch, sehingga banyak thread bisa mencari
+# bersamaan tanpa menyentuh state Pipeline yang sedang diubah.
+# File yang berubah ditandai terhapus lalu ditambahkan ulang (fold-in), jadi
+# index terus membesar: jika porsi dokumen terhapus melewati rebuild_ratio,
+# model dibangun ulang dari folder (sekaligus melatih ulang SVD). Model dan
+# ir_index.npz disimpan paling sering tiap save_interval detik, bukan per batch.
+class Watcher:
+    def __init__(self, ir, folder_path, debounce=2.0, max_batch=100, interval=2.0, model_path=None,
+                 index_path=None, save_interval=300.0, rebuild_ratio=0.25):
+        self.ir = ir
+        self.folder_path = folder_path
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.model_path = model_path
+        self.index_path = index_path
+        self.save_interval = save_interval
+        self.rebuild_ratio = rebuild_ratio
+        self.stop_event = threading.Event()
+
+        # Ekstraksi & stemming memakai Pipeline terpisah supaya tidak berbagi
+        # stemmer dengan thread yang sedang melayani query
+        self.reader = Pipeline()
+        self.index = ir.snapshot()
+
+        # metadata.csv dibaca ulang setiap kali mtime-nya berubah
+        self.sidecar = {}
+        self.sidecar_mtime = None
+        self._refresh_sidecar()
+
+        # path -> (jenis event, waktu event pertama)
+        self.pending = {}
+        self.last_event = 0.0
+        self.lags = []
+        self.batches = 0
+        self.docs_changed = 0
+        self.rebuilds = 0
+        self.dirty = False
+        self.last_save = time.time()
+
+        known = dict(zip(ir.file_paths, ir.file_mtimes))
+        for doc_id in np.flatnonzero(ir.deleted):
+            known.pop(ir.file_paths[doc_id], None)
+
+        try:
+            self.source = InotifySource(folder_path)
+            print("[*] Watch mode: inotify")
+            # perubahan saat watcher belum jalan
+            self._queue(PollingSource(folder_path, known).poll(0))
+        except Exception as e:
+            print(f"[*] Watch mode: polling mtime tiap {interval}s ({e})")
+            self.source = PollingSource(folder_path, known, interval)
+
+    def search(self, query, **kwargs):
+        # referensi dibaca sekali; snapshot lama tetap valid selama dipakai
+        return self.index.search(query, **kwargs)
+
+    def _refresh_sidecar(self):
+        path = os.path.join(self.folder_path, METADATA_FILE)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if mtime != self.sidecar_mtime:
+            self.sidecar = load_metadata_file(self.folder_path)
+            self.sidecar_mtime = mtime
+
+    def _queue(self, events):
+        now = time.time()
+        for path, kind in events:
+            first_seen = self.pending.get(path, (None, now))[1]
+            self.pending[path] = (kind, first_seen)
+        if events:
+            self.last_event = now
+
+    def run(self):
+        print(f"[*] Memantau folder '{self.folder_path}' (Ctrl+C untuk berhenti)...")
+        try:
+            while not self.stop_event.is_set():
+                self._queue(self.source.poll(timeout=min(self.debounce, 1.0)))
+                quiet = time.time() - self.last_event >= self.debounce
+                if self.pending and (quiet or len(self.pending) >= self.max_batch):
+                    self.flush()
+                self.save()
+        finally:
+            self.save(force=True)
+
+    def stop(self):
+        self.stop_event.set()
+
+    # menerapkan satu micro-batch ke index
+    def flush(self):
+        batch = dict(list(self.pending.items())[:self.max_batch])
+        for path in batch:
+            del self.pending[path]
+
+        changed = [path for path, (kind, _) in batch.items() if kind == 'changed' and os.path.exists(path)]
+        # File tanpa baris sidecar mewarisi kategori/sumber dari versi lamanya di index
+        self._refresh_sidecar()
+        prepared = self.reader.prepare_documents(changed, self.sidecar, self.ir.records_by_path(changed))
+
+        removed = self.ir.remove_documents(list(batch))
+        added = self.ir.apply_documents(prepared)
+        self.dirty = True
+        if self.ir.deleted.mean() > self.rebuild_ratio:
+            self.rebuild()
+        self.index = self.ir.snapshot()
+
+        done = time.time()
+        # lag: dari file diletakkan (mtime / event pertama) sampai bisa dicari
+        for path, (kind, first_seen) in batch.items():
+            dropped = first_seen
+            if kind == 'changed' and os.path.exists(path):
+                dropped = min(first_seen, os.path.getmtime(path))
+            self.lags.append(done - dropped)
+        self.lags = self.lags[-1000:]
+        self.batches += 1
+        self.docs_changed += len(batch)
+
+        m = self.metrics()
+        print(f"[*] watch batch #{self.batches}: +{added} -{removed} dokumen | "
+              f"lag p50 {m['lag_p50_s']:.2f}s p95 {m['lag_p95_s']:.2f}s")
+
+    # pemadatan: model baru dibangun dari isi folder di Pipeline terpisah lalu
+    # menggantikan yang lama; query tetap dilayani snapshot lama selama proses
+    def rebuild(self):
+        old = self.ir
+        print(f"[*] {int(old.deleted.sum())}/{len(old.deleted)} dokumen terhapus, model dibangun ulang...")
+        fresh = Pipeline()
+        fresh.read_directory(self.folder_path)
+        if not fresh.raw_contents:
+            return
+        # kategori/sumber warisan (lihat flush) tetap dipertahankan
+        previous = old.records_by_path(fresh.file_paths)
+        records = [inherit_metadata(fresh.metadata.record(doc_id), previous.get(path))
+                   for doc_id, path in enumerate(fresh.file_paths)]
+        fresh.metadata = DocumentMetadata()
+        fresh.metadata.add(records)
+
+        fresh.build(fresh.preprocess_all(positional=old.positional is not None), old.engine.lsi_model.num_topics)
+        if old.clusters is not None:
+            fresh.cluster(len(old.clusters))
+        self.ir = fresh
+        self.rebuilds += 1
+        self.dirty = True
+
+    # model + ir_index.npz ditulis jika ada perubahan dan save_interval sudah lewat
+    # (force=True: langsung, mis. saat watcher berhenti)
+    def save(self, force=False):
+        if not self.dirty or not (force or time.time() - self.last_save >= self.save_interval):
+            return
+        if self.model_path:
+            self.ir.save_model(self.model_path)
+        if self.index_path:
+            self.ir.export_index(self.index_path)
+        self.dirty = False
+        self.last_save = time.time()
+
+    def metrics(self):
+        lags = np.array(self.lags) if self.lags else np.zeros(1)
+        return {
+            'batches': self.batches,
+            'docs_changed': self.docs_changed,
+            'rebuilds': self.rebuilds,
+            'pending': len(self.pending),
+            'lag_last_s': float(lags[-1]),
+            'lag_p50_s': float(np.percentile(lags, 50)),
+            'lag_p95_s': float(np.percentile(lags, 95)),
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Watch mode: index selalu mengikuti isi folder")
+    parser.add_argument('folder', help="folder dataset")
+    parser.add_argument('--model', default='ir_model.pkl')
+    parser.add_argument('--index', default='ir_index.npz', help="index SearchRuntime yang ikut diperbarui")
+    parser.add_argument('--debounce', type=float, default=2.0)
+    parser.add_argument('--interval', type=float, default=2.0, help="interval polling jika inotify tidak tersedia")
+    parser.add_argument('--max-batch', type=int, default=100)
+    parser.add_argument('--save-interval', type=float, default=300.0, help="detik minimum antar penyimpanan")
+    parser.add_argument('--rebuild-ratio', type=float, default=0.25,
+                        help="bangun ulang model jika porsi dokumen terhapus melewati nilai ini")
+    args = parser.parse_args()
+
+    ir = Pipeline()
+    # model lama tanpa daftar path file tidak bisa dipantau -> build ulang
+    if not (os.path.exists(args.model) and ir.load_model(args.model) and ir.file_paths):
+        ir.run(args.folder, model_path=args.model, index_path=args.index)
+
+    watcher = Watcher(ir, args.folder, args.debounce, args.max_batch, args.interval, args.model, args.index,
+                      args.save_interval, args.rebuild_ratio)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print(f"[*] Berhenti. {watcher.metrics()}")